@@ -51,11 +51,16 @@ class BaseAnalyzer(ABC):
         name:        Unique identifier for this analyzer (shown in logs)
         description: Human-readable description of what it checks
         order:       Execution order (lower = runs first, default 100)
+        parallelizable: Run on the pipeline's thread pool instead of inline.
+                     Set this for analyzers that mostly wait on I/O or
+                     GIL-releasing C code (DNS, Postgres, NLP inference)
+                     and whose analyze() is thread-safe.
     """
 
     name: str = "unnamed"
     description: str = ""
     order: int = 100
+    parallelizable: bool = False
 
     @abstractmethod
     def analyze(self, email: EmailEvent) -> AnalysisResult:
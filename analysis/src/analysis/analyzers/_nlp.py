@@ -0,0 +1,130 @@
+# Copyright (c) 2026 John Earle
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared zero-shot NLP classifier.
+
+The BEC and SaaS analyzers use the same model. Loading it once per worker
+process keeps a single copy in memory, and the worker warms it up at process
+start (see celery_app / warm_up) so the first email doesn't pay the load or
+first-inference time.
+
+Zero-shot classification runs one premise/hypothesis pair per candidate
+label. The pipeline is built with a batch size that covers every label set
+we use (BEC has 7), so all pairs for an email go through the model in one
+padded forward pass instead of one pass per label.
+
+The model's Linear layers are dynamically quantized to int8 after loading
+(NLP_QUANTIZE=0 keeps fp32). Inference always runs on CPU here, where int8
+matmuls move a quarter of the weight bytes and run on the VNNI/dot-product
+units. Scores shift slightly compared with fp32.
+
+Each prefork child runs its own copy of the model, so torch's intra-op
+thread pool is capped (NLP_TORCH_THREADS) to keep several children from
+each spawning one thread per core.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+NLP_MODEL = "cross-encoder/nli-distilroberta-base"
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", "8"))
+NLP_QUANTIZE = os.environ.get("NLP_QUANTIZE", "1") == "1"
+NLP_TORCH_THREADS = int(
+    os.environ.get("NLP_TORCH_THREADS", str(min(4, os.cpu_count() or 1)))
+)
+
+# None = not loaded yet, False = load failed (don't retry every email)
+_nlp_classifier = None
+# BEC and SaaS can ask for the model from two pipeline threads at once;
+# only one of them should load it.
+_load_lock = threading.Lock()
+
+
+class _SerializedClassifier:
+    """Wrap the pipeline so concurrent analyzers take turns calling it.
+
+    BEC and SaaS can run on pipeline threads at the same time, and a
+    Hugging Face pipeline (its fast tokenizer in particular) is not safe to
+    call from two threads at once.
+    """
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            return self._pipe(*args, **kwargs)
+
+
+def get_nlp_classifier():
+    """Return the zero-shot classifier, or None if it can't be loaded."""
+    if _nlp_classifier is None:
+        with _load_lock:
+            # Re-check: another thread may have loaded it while we waited
+            if _nlp_classifier is None:
+                _load_classifier()
+    return _nlp_classifier if _nlp_classifier is not False else None
+
+
+def warm_up() -> None:
+    """Load the model and push one tiny input through it.
+
+    The first real inference also pays one-off costs beyond loading:
+    tokenizer setup, torch kernel selection, and packing int8 weights. A
+    throwaway call at worker start moves those off the first email.
+    """
+    classifier = get_nlp_classifier()
+    if classifier is None:
+        return
+    try:
+        classifier("Warm-up.", ["greeting", "request"], multi_label=True)
+    except Exception as exc:
+        logger.warning("NLP warm-up inference failed (non-fatal): %s", exc)
+
+
+def _load_classifier() -> None:
+    global _nlp_classifier
+    try:
+        import torch
+        from transformers import pipeline
+        torch.set_num_threads(NLP_TORCH_THREADS)
+        logger.info("Loading zero-shot classifier (%s)...", NLP_MODEL)
+        pipe = pipeline(
+            "zero-shot-classification",
+            model=NLP_MODEL,
+            device=-1,
+            batch_size=NLP_BATCH_SIZE,
+        )
+        if NLP_QUANTIZE:
+            _quantize(pipe)
+        _nlp_classifier = _SerializedClassifier(pipe)
+        logger.info("NLP model loaded")
+    except Exception as exc:
+        logger.warning("NLP model load failed: %s", exc)
+        _nlp_classifier = False
+
+
+def _quantize(pipe) -> None:
+    """Swap the model's Linear layers for dynamic int8 ones (best-effort)."""
+    import torch
+    try:
+        pipe.model = torch.ao.quantization.quantize_dynamic(
+            pipe.model, {torch.nn.Linear}, dtype=torch.qint8,
+        )
+    except Exception as exc:
+        logger.warning("NLP model quantization failed, using fp32: %s", exc)
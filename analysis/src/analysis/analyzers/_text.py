@@ -0,0 +1,65 @@
+# Copyright (c) 2026 John Earle
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared body-text helpers for analyzers.
+
+Several analyzers (BEC, SaaS usage) need the plain-text version of the same
+HTML body. Stripping is done once per distinct body and cached, so the second
+analyzer in the pipeline gets the text for free.
+"""
+
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_SKIP_TAGS = frozenset(("style", "script", "head"))
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Extract plain text from HTML, stripping all tags."""
+
+    def __init__(self):
+        super().__init__()
+        self._text: list[str] = []
+        self._skip = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip = True
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = False
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text.append(data)
+
+    def get_text(self) -> str:
+        return " ".join(self._text)
+
+
+@lru_cache(maxsize=32)
+def strip_html(html: str) -> str:
+    """Convert HTML to whitespace-normalised plain text."""
+    extractor = _HTMLTextExtractor()
+    try:
+        extractor.feed(html)
+        text = extractor.get_text()
+    except Exception:
+        text = _TAG_RE.sub(" ", html)
+    return _WS_RE.sub(" ", text).strip()
@@ -30,15 +30,17 @@ from analysis.analyzers._base import BaseAnalyzer
 from analysis.models import AnalysisResult, EmailEvent, Observation
 
 
-DANGEROUS_EXTENSIONS = {
+DANGEROUS_EXTENSIONS = frozenset({
     ".exe", ".scr", ".pif", ".com", ".bat", ".cmd", ".msi", ".msp",
     ".js", ".jse", ".vbs", ".vbe", ".wsf", ".wsh", ".ps1", ".psm1",
     ".docm", ".xlsm", ".pptm", ".dotm", ".xltm",
     ".iso", ".img", ".vhd", ".vhdx",
     ".dll", ".sys", ".drv", ".cpl", ".inf", ".reg", ".lnk", ".hta",
-}
+})
 
-DOUBLE_EXTENSION_TRAP = {".exe", ".scr", ".bat", ".cmd", ".js", ".vbs", ".ps1"}
+DOUBLE_EXTENSION_TRAP = frozenset({".exe", ".scr", ".bat", ".cmd", ".js", ".vbs", ".ps1"})
+
+SMALL_EXECUTABLE_EXTENSIONS = frozenset({".exe", ".scr", ".dll"})
 
 
 class AttachmentAnalyzer(BaseAnalyzer):
@@ -64,19 +66,17 @@ class AttachmentAnalyzer(BaseAnalyzer):
 
         for attachment in email.attachments:
             name = attachment.name.lower()
+            # Final extension, computed once and reused by every check below
+            _, dot, tail = name.rpartition(".")
+            ext = dot + tail
 
             # Dangerous extension
-            for ext in DANGEROUS_EXTENSIONS:
-                if name.endswith(ext):
-                    dangerous_exts.append(ext)
-                    break
-
-            # Double extension
-            parts = name.rsplit(".", maxsplit=2)
-            if len(parts) >= 3:
-                real_ext = f".{parts[-1]}"
-                if real_ext in DOUBLE_EXTENSION_TRAP:
-                    double_exts.append(attachment.name)
+            if ext in DANGEROUS_EXTENSIONS:
+                dangerous_exts.append(ext)
+
+            # Double extension (e.g. invoice.pdf.exe)
+            if ext in DOUBLE_EXTENSION_TRAP and name.count(".") >= 2:
+                double_exts.append(attachment.name)
 
             # File hash
             if attachment.content_bytes:
@@ -93,9 +93,8 @@ class AttachmentAnalyzer(BaseAnalyzer):
                 encrypted_count += 1
 
             # Small executable
-            if any(name.endswith(ext) for ext in (".exe", ".scr", ".dll")):
-                if attachment.size < 50_000:
-                    small_exes += 1
+            if ext in SMALL_EXECUTABLE_EXTENSIONS and attachment.size < 50_000:
+                small_exes += 1
 
         if dangerous_exts:
             observations.append(
@@ -20,14 +20,15 @@ scanning for detecting Business Email Compromise attempts.
 
 Pipeline (read-only):
   1. Content signal scan — regex-based entity + keyword extraction
-  2. NLP intent classification — multi-label zero-shot
-  3. Sender profile lookup — tenure, display names, category history
+  2. Sender profile lookup — tenure, display names, category history
+  3. NLP intent classification — multi-label zero-shot, skipped for
+     routine mail (no content signals, established low-risk sender)
   4. Sender-recipient pair queries — first contact, context escalation
   5. Risk scoring — composite score from all signals
 
-Observations produced (21 total):
+Observations produced (22 total):
     bec_risk_score, bec_risk_level, intent_category, intent_confidence,
-    sender_tenure_days, is_new_sender, display_name_anomaly, category_shift,
+    intent_source, sender_tenure_days, is_new_sender, display_name_anomaly, category_shift,
     time_anomaly, reply_to_mismatch, is_first_contact,
     low_volume_sensitive_request, context_escalation,
     content_has_financial_entities, content_has_payment_instructions,
@@ -36,19 +37,21 @@ Observations produced (21 total):
     topics_detected, content_has_personal_info
 """
 import logging
-import math
-import re
-from datetime import datetime, timezone
-from html.parser import HTMLParser
+import os
+from datetime import datetime
 from typing import Optional
 
 from analysis.analyzers._base import BaseAnalyzer
+from analysis.analyzers._nlp import get_nlp_classifier as _get_nlp_classifier
+from analysis.analyzers._text import strip_html
+from analysis.analyzers.bec.cache import TTLCache
 from analysis.analyzers.bec.models import (
     BECSignals,
     CATEGORY_RISK_WEIGHTS,
     ContentSignals,
     HIGH_RISK_CATEGORIES,
     INTENT_CATEGORIES,
+    NEW_SENDER_DAYS,
     NLP_CANDIDATE_LABELS,
     SenderProfile,
     SenderRecipientPair,
@@ -58,64 +61,16 @@ from analysis.models import AnalysisResult, EmailEvent, Observation
 
 logger = logging.getLogger(__name__)
 
-
 # ---------------------------------------------------------------------------
-# HTML text extraction (shared utility)
+# Profile lookup cache — per worker process. update_behavioral_profiles()
+# drops the keys it writes, so this process sees its own updates at once;
+# other workers may see a profile up to the TTL old.
 # ---------------------------------------------------------------------------
-class _HTMLTextExtractor(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self._text: list[str] = []
-        self._skip = False
-
-    def handle_starttag(self, tag, attrs):
-        if tag in ("style", "script", "head"):
-            self._skip = True
-
-    def handle_endtag(self, tag):
-        if tag in ("style", "script", "head"):
-            self._skip = False
-
-    def handle_data(self, data):
-        if not self._skip:
-            self._text.append(data)
-
-    def get_text(self) -> str:
-        return " ".join(self._text)
+_PROFILE_CACHE_SIZE = int(os.environ.get("BEC_PROFILE_CACHE_SIZE", "10000"))
+_PROFILE_CACHE_TTL = int(os.environ.get("BEC_PROFILE_CACHE_TTL", "300"))  # seconds
 
-
-def _strip_html(html: str) -> str:
-    extractor = _HTMLTextExtractor()
-    try:
-        extractor.feed(html)
-        text = extractor.get_text()
-    except Exception:
-        text = re.sub(r"<[^>]+>", " ", html)
-    return re.sub(r"\s+", " ", text).strip()
-
-
-# ---------------------------------------------------------------------------
-# NLP classifier — lazy-loaded singleton (shared with SaaS analyzer process)
-# ---------------------------------------------------------------------------
-_nlp_classifier = None
-
-
-def _get_nlp_classifier():
-    global _nlp_classifier
-    if _nlp_classifier is None:
-        try:
-            from transformers import pipeline
-            logger.info("BEC: loading zero-shot classifier...")
-            _nlp_classifier = pipeline(
-                "zero-shot-classification",
-                model="cross-encoder/nli-distilroberta-base",
-                device=-1,
-            )
-            logger.info("BEC: NLP model loaded")
-        except Exception as exc:
-            logger.warning("BEC: NLP model load failed: %s", exc)
-            _nlp_classifier = False
-    return _nlp_classifier if _nlp_classifier is not False else None
+_profile_cache = TTLCache(maxsize=_PROFILE_CACHE_SIZE, ttl=_PROFILE_CACHE_TTL)
+_MISS = object()  # distinguishes "not cached" from a cached None (no history)
 
 
 # ---------------------------------------------------------------------------
@@ -136,49 +91,59 @@ def _detect_category_shift(
     profile: SenderProfile, current_category: str,
 ) -> bool:
     """True if the current category is high-risk but rare for this sender."""
-    if current_category not in HIGH_RISK_CATEGORIES:
-        return False
-    total = sum(profile.typical_categories.values())
-    if total < 5:
-        # Not enough history to judge
-        return False
-    cat_count = profile.typical_categories.get(current_category, 0)
-    ratio = cat_count / total
-    # High-risk category seen in < 5% of historical mail → shift
-    return ratio < 0.05
+    # Worked out once per (cached) profile: high-risk categories seen in
+    # < 5% of the sender's mail, given enough history to judge
+    return current_category in profile.rare_high_risk_categories
 
 
 def _detect_time_anomaly(
     profile: SenderProfile, send_hour: int,
 ) -> bool:
     """True if the send hour is >2σ from the sender's typical distribution."""
-    hours = profile.typical_send_hours
-    if not hours:
-        return False
-    total = sum(hours.values())
-    if total < 10:
-        return False  # not enough data
-
-    # Mean and std dev of send hours
-    mean_hour = sum(int(h) * c for h, c in hours.items()) / total
-    variance = sum(c * (int(h) - mean_hour) ** 2 for h, c in hours.items()) / total
-    std_dev = math.sqrt(variance) if variance > 0 else 1.0
-
-    return abs(send_hour - mean_hour) > 2 * std_dev
+    # The 24 possible answers are worked out once per (cached) profile
+    return send_hour in profile.anomalous_hours
 
 
 def _detect_context_escalation(
     pair: SenderRecipientPair, current_category: str,
 ) -> bool:
     """True if current category is high-risk but uncommon for this pair."""
-    if current_category not in HIGH_RISK_CATEGORIES:
+    return current_category in pair.rare_high_risk_categories
+
+
+# ---------------------------------------------------------------------------
+# NLP gate — most mail is routine traffic from established senders
+# ---------------------------------------------------------------------------
+
+#: Skip the zero-shot model for routine mail (BEC_SKIP_NLP_FOR_BENIGN=0
+#: classifies every email).
+_SKIP_NLP_FOR_BENIGN = os.environ.get("BEC_SKIP_NLP_FOR_BENIGN", "1") == "1"
+
+#: Intent confidence reported when the model is skipped.
+_ROUTINE_MAIL_CONFIDENCE = 70
+
+
+def _is_routine_mail(
+    content: ContentSignals, profile: Optional[SenderProfile],
+) -> bool:
+    """True if an email can be labelled informational without NLP.
+
+    Requires all of: no content signal fired (urgency, financial entities,
+    payment, credential or PII language), an established sender (past the
+    new-sender window), and a sender whose usual mail isn't high-risk.
+    """
+    if (
+        content.has_urgency_language
+        or content.has_financial_entities
+        or content.has_payment_instructions
+        or content.has_credential_request
+        or content.has_personal_info_request
+    ):
         return False
-    total = sum(pair.category_distribution.values())
-    if total < 3:
+    if profile is None or profile.is_new:
         return False
-    cat_count = pair.category_distribution.get(current_category, 0)
-    ratio = cat_count / total
-    return ratio < 0.1
+    dominant = profile.dominant_category
+    return dominant is not None and dominant not in HIGH_RISK_CATEGORIES
 
 
 # ---------------------------------------------------------------------------
@@ -261,6 +226,7 @@ class BECAnalyzer(BaseAnalyzer):
     name = "bec_detector"
     description = "Behavioral BEC detection via sender profiling and sentiment analysis"
     order = 45  # after headers/URLs/attachments, before SaaS NLP
+    parallelizable = True  # Postgres lookups + NLP inference
 
     def analyze(self, email: EmailEvent) -> AnalysisResult:
         """Read-only analysis: classify, scan content, query profiles, score."""
@@ -269,34 +235,42 @@ class BECAnalyzer(BaseAnalyzer):
         # --- 0. Extract body text once (shared by NLP + content scanner) ---
         body_text = email.body.content or ""
         if email.body.content_type == "html" or "<" in body_text[:50]:
-            body_text = _strip_html(body_text)
+            body_text = strip_html(body_text)
         full_text = f"Subject: {email.subject or '(no subject)'}\n\n{body_text}"
 
         # --- 1. Scan content signals (regex, zero-cost) ---
         content = _scan_content_signals(full_text)
 
-        # --- 2. Classify intent (NLP, multi-label) ---
-        signals.intent_category, signals.intent_confidence, topics = (
-            self._classify_intent_multilabel(full_text)
-        )
-        content.topics_detected = topics
-
-        # --- 3. Query sender profile ---
+        # --- 2. Query sender profile ---
         domain = _sender_domain(email.sender)
         profile = self._get_profile(email.tenant_id, domain)
 
+        # --- 3. Classify intent (NLP, multi-label) ---
+        if _SKIP_NLP_FOR_BENIGN and _is_routine_mail(content, profile):
+            # Nothing in the text and nothing about the sender warrants
+            # a transformer pass — call it what NLP nearly always does.
+            signals.intent_category = "informational"
+            signals.intent_confidence = _ROUTINE_MAIL_CONFIDENCE
+            signals.intent_source = "skipped"
+        else:
+            signals.intent_category, signals.intent_confidence, topics = (
+                self._classify_intent_multilabel(full_text)
+            )
+            content.topics_detected = topics
+
         if profile is None:
             # First time seeing this sender domain
             signals.is_new_sender = True
             signals.sender_tenure_days = 0.0
         else:
-            signals.is_new_sender = profile.is_new
-            signals.sender_tenure_days = profile.tenure_days
+            tenure_days = profile.tenure_days
+            signals.is_new_sender = tenure_days < NEW_SENDER_DAYS
+            signals.sender_tenure_days = tenure_days
 
             # Display name anomaly
             if email.sender_name and profile.known_display_names:
                 signals.display_name_anomaly = (
-                    email.sender_name not in profile.known_display_names
+                    email.sender_name not in profile.display_name_set
                 )
 
             # Category shift
@@ -365,6 +339,7 @@ class BECAnalyzer(BaseAnalyzer):
             Observation(key="bec_risk_level", value=level, type="text"),
             Observation(key="intent_category", value=signals.intent_category, type="text"),
             Observation(key="intent_confidence", value=signals.intent_confidence, type="numeric"),
+            Observation(key="intent_source", value=signals.intent_source, type="text"),
             Observation(key="sender_tenure_days", value=round(signals.sender_tenure_days, 1), type="numeric"),
             Observation(key="is_new_sender", value=signals.is_new_sender, type="boolean"),
             Observation(key="display_name_anomaly", value=signals.display_name_anomaly, type="boolean"),
@@ -435,48 +410,69 @@ class BECAnalyzer(BaseAnalyzer):
 
     # ----- Profile queries (read-only, best-effort) -----
 
+    # Successful lookups (including "no history") are cached; failures are
+    # not, so a DB blip doesn't make a known sender look new for a TTL.
+
     def _get_profile(
         self, tenant_id: str, sender_domain: str,
     ) -> Optional[SenderProfile]:
+        key = ("profile", tenant_id, sender_domain)
+        cached = _profile_cache.get(key, _MISS)
+        if cached is not _MISS:
+            return cached
         try:
             from analysis.analyzers.bec.db import init_bec_schema, get_sender_profile
             from ices_shared.db import get_connection
             init_bec_schema()
             with get_connection() as conn:
-                return get_sender_profile(conn, tenant_id, sender_domain)
+                profile = get_sender_profile(conn, tenant_id, sender_domain)
         except Exception as exc:
             logger.debug("BEC: profile lookup failed (non-fatal): %s", exc)
             return None
+        _profile_cache.set(key, profile)
+        return profile
 
     def _get_pair(
         self, tenant_id: str, sender_addr: str, recipient: str,
     ) -> Optional[SenderRecipientPair]:
+        key = ("pair", tenant_id, sender_addr, recipient)
+        cached = _profile_cache.get(key, _MISS)
+        if cached is not _MISS:
+            return cached
         try:
             from analysis.analyzers.bec.db import init_bec_schema, get_sender_recipient_pair
             from ices_shared.db import get_connection
             init_bec_schema()
             with get_connection() as conn:
-                return get_sender_recipient_pair(
+                pair = get_sender_recipient_pair(
                     conn, tenant_id, sender_addr, recipient,
                 )
         except Exception as exc:
             logger.debug("BEC: pair lookup failed (non-fatal): %s", exc)
             return None
+        _profile_cache.set(key, pair)
+        return pair
 
     def _get_domain_pair(
         self, tenant_id: str, sender_domain: str, recipient: str,
     ) -> Optional[SenderRecipientPair]:
+        key = ("domain_pair", tenant_id, sender_domain, recipient)
+        cached = _profile_cache.get(key, _MISS)
+        if cached is not _MISS:
+            return cached
         try:
             from analysis.analyzers.bec.db import init_bec_schema, get_domain_pair_summary
             from ices_shared.db import get_connection
             init_bec_schema()
             with get_connection() as conn:
-                return get_domain_pair_summary(
+                pair = get_domain_pair_summary(
                     conn, tenant_id, sender_domain, recipient,
                 )
         except Exception as exc:
             logger.debug("BEC: domain pair lookup failed (non-fatal): %s", exc)
             return None
+        _profile_cache.set(key, pair)
+        return pair
 
     # ----- Helpers -----
 
@@ -563,6 +559,12 @@ def update_behavioral_profiles(email: EmailEvent, verdict) -> None:
 
         conn.commit()
 
+    # Drop what we just changed so the next email from this sender re-reads it
+    _profile_cache.discard(("profile", tenant_id, domain))
+    for recip in recipients:
+        _profile_cache.discard(("pair", tenant_id, sender_addr, recip))
+        _profile_cache.discard(("domain_pair", tenant_id, domain, recip))
+
     logger.info(
         "BEC profiles updated: sender=%s domain=%s recipients=%d",
         sender_addr, domain, len(recipients),
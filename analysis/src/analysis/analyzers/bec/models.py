@@ -19,8 +19,11 @@ Self-contained dataclasses for the BEC detection analyzer's behavioral
 profiles and anomaly signals.  These are internal to the BEC module and
 are NOT shared with other services.
 """
+import math
+import time
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from functools import cached_property
+from datetime import datetime
 from typing import Optional
 
 
@@ -74,9 +77,48 @@ HIGH_RISK_CATEGORIES: frozenset[str] = frozenset({
 # Sender profile (90-day rolling window)
 # ---------------------------------------------------------------------------
 
+#: A sender seen for fewer days than this counts as new.
+NEW_SENDER_DAYS: int = 7
+
+#: Emails needed before send-hour anomalies are judged.
+MIN_SEND_HOUR_SAMPLES: int = 10
+
+#: Category shift: a high-risk category in < 5% of a sender's mail (once
+#: there are at least 5 categorised emails) is rare for that sender.
+CATEGORY_SHIFT_MIN_EMAILS: int = 5
+CATEGORY_SHIFT_MAX_RATIO: float = 0.05
+
+#: Context escalation: the same test per sender-recipient pair, with a
+#: lower history bar and a 10% threshold.
+ESCALATION_MIN_EMAILS: int = 3
+ESCALATION_MAX_RATIO: float = 0.1
+
+
+def _rare_high_risk_categories(
+    counts: dict[str, int], min_total: int, max_ratio: float,
+) -> frozenset[str]:
+    """High-risk categories that make up less than ``max_ratio`` of ``counts``.
+
+    Empty when the history has fewer than ``min_total`` emails.
+    """
+    total = sum(counts.values())
+    if total < min_total:
+        return frozenset()
+    return frozenset(
+        cat for cat in HIGH_RISK_CATEGORIES
+        if counts.get(cat, 0) / total < max_ratio
+    )
+
+
 @dataclass
 class SenderProfile:
-    """Behavioural baseline for a sender domain within a tenant."""
+    """Behavioural baseline for a sender domain within a tenant.
+
+    Profiles are read-only once loaded, and the analyzer caches them across
+    emails, so aggregates over the history dicts are computed on first use
+    and kept (``cached_property``). Build a new profile rather than editing
+    the dicts of an existing one.
+    """
 
     tenant_id: str = ""
     sender_domain: str = ""
@@ -90,26 +132,77 @@ class SenderProfile:
 
     # -- derived helpers --
 
+    @cached_property
+    def first_seen_epoch(self) -> Optional[float]:
+        """first_seen_at as Unix seconds, converted once per profile."""
+        return self.first_seen_at.timestamp() if self.first_seen_at else None
+
     @property
     def tenure_days(self) -> float:
         """Days since the sender was first seen (0 if unknown)."""
-        if not self.first_seen_at:
+        first_seen = self.first_seen_epoch
+        if first_seen is None:
             return 0.0
-        delta = datetime.now(timezone.utc) - self.first_seen_at
-        return max(delta.total_seconds() / 86400, 0.0)
+        # Plain epoch-seconds arithmetic — no tz-aware "now" or timedelta
+        # objects on the per-email path.
+        return max((time.time() - first_seen) / 86400, 0.0)
 
     @property
     def is_new(self) -> bool:
-        """True if sender has been seen for fewer than 7 days."""
-        return self.tenure_days < 7
+        """True if sender has been seen for fewer than NEW_SENDER_DAYS days."""
+        return self.tenure_days < NEW_SENDER_DAYS
 
-    @property
+    @cached_property
     def dominant_category(self) -> Optional[str]:
         """Most frequently observed intent category, or None."""
         if not self.typical_categories:
             return None
         return max(self.typical_categories, key=self.typical_categories.get)
 
+    @cached_property
+    def display_name_set(self) -> frozenset[str]:
+        """known_display_names as a set, for O(1) membership checks."""
+        return frozenset(self.known_display_names)
+
+    @cached_property
+    def rare_high_risk_categories(self) -> frozenset[str]:
+        """High-risk categories this sender rarely sends (category shift)."""
+        return _rare_high_risk_categories(
+            self.typical_categories,
+            CATEGORY_SHIFT_MIN_EMAILS, CATEGORY_SHIFT_MAX_RATIO,
+        )
+
+    @cached_property
+    def send_hour_stats(self) -> tuple[int, float, float]:
+        """(count, mean hour, std dev) of the send-hour histogram.
+
+        The std dev is 1.0 when there's no spread (or no data), so callers
+        can use it as a divisor-free threshold directly.
+        """
+        hours = self.typical_send_hours
+        total = sum(hours.values())
+        if not total:
+            return 0, 0.0, 1.0
+        weighted = [(int(h), c) for h, c in hours.items()]
+        mean_hour = sum(h * c for h, c in weighted) / total
+        variance = sum(c * (h - mean_hour) ** 2 for h, c in weighted) / total
+        std_dev = math.sqrt(variance) if variance > 0 else 1.0
+        return total, mean_hour, std_dev
+
+    @cached_property
+    def anomalous_hours(self) -> frozenset[int]:
+        """UTC hours (0-23) more than 2σ from the sender's mean send hour.
+
+        Empty until the sender has at least MIN_SEND_HOUR_SAMPLES emails,
+        since a thinner history can't say what's unusual.
+        """
+        total, mean_hour, std_dev = self.send_hour_stats
+        if total < MIN_SEND_HOUR_SAMPLES:
+            return frozenset()
+        return frozenset(
+            h for h in range(24) if abs(h - mean_hour) > 2 * std_dev
+        )
+
 
 # ---------------------------------------------------------------------------
 # Sender ↔ recipient pair
@@ -136,17 +229,26 @@ class SenderRecipientPair:
     def is_first_contact(self) -> bool:
         return self.message_count == 0
 
+    @cached_property
+    def rare_high_risk_categories(self) -> frozenset[str]:
+        """High-risk categories rarely seen on this pair (context escalation)."""
+        return _rare_high_risk_categories(
+            self.category_distribution,
+            ESCALATION_MIN_EMAILS, ESCALATION_MAX_RATIO,
+        )
+
 
 # ---------------------------------------------------------------------------
 # Aggregated anomaly signals
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class BECSignals:
     """Anomaly flags computed per email, used to derive the risk score."""
 
     intent_category: str = "informational"
     intent_confidence: int = 0
+    intent_source: str = "nlp"  # "skipped" when the routine-mail gate bypassed NLP
 
     # sender-level
     is_new_sender: bool = False
@@ -166,7 +268,7 @@ class BECSignals:
 # Granular content signals (Abnormal-style)
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class ContentSignals:
     """Fine-grained content analysis signals extracted via regex + NLP.
 
@@ -24,51 +24,51 @@ from analysis.analyzers.bec.models import ContentSignals
 
 
 # ---------------------------------------------------------------------------
-# Keyword lists
+# Keyword lists — immutable, built once at import and shared by every scan
 # ---------------------------------------------------------------------------
 
 #: Urgency keywords — case-insensitive phrase matching.
-_URGENCY_KEYWORDS: list[str] = [
+_URGENCY_KEYWORDS: tuple[str, ...] = (
     "urgent", "immediately", "asap", "right away", "time-sensitive",
     "act now", "don't delay", "do not delay", "as soon as possible",
     "right now", "today", "deadline", "critical", "emergency",
     "without delay", "prompt attention", "quickly",
-]
+)
 
 #: Payment / financial instruction keywords.
-_PAYMENT_KEYWORDS: list[str] = [
+_PAYMENT_KEYWORDS: tuple[str, ...] = (
     "wire transfer", "ach", "bank account", "routing number",
     "account number", "payment details", "invoice", "direct deposit",
     "bank details", "swift code", "iban", "remittance",
     "payment instructions", "updated banking", "new account",
     "wiring instructions",
-]
+)
 
 #: Credential / account access keywords.
-_CREDENTIAL_KEYWORDS: list[str] = [
+_CREDENTIAL_KEYWORDS: tuple[str, ...] = (
     "password", "login", "verify your account", "credentials",
     "two-factor", "reset your password", "sign in", "authentication",
     "security code", "one-time password", "otp", "mfa",
-]
+)
 
 #: Personal information keywords.
-_PERSONAL_INFO_KEYWORDS: list[str] = [
+_PERSONAL_INFO_KEYWORDS: tuple[str, ...] = (
     "social security", "ssn", "date of birth", "tax id", "ein",
     "driver's license", "passport number", "maiden name",
     "personal information", "w-2", "w-9", "1099",
-]
+)
 
 #: Formal tone markers.
-_FORMAL_MARKERS: list[str] = [
+_FORMAL_MARKERS: tuple[str, ...] = (
     "dear", "sincerely", "regards", "respectfully", "best regards",
     "kind regards", "yours truly", "cordially", "to whom it may concern",
-]
+)
 
 #: Informal tone markers.
-_INFORMAL_MARKERS: list[str] = [
+_INFORMAL_MARKERS: tuple[str, ...] = (
     "hey", "hi there", "what's up", "yo", "sup", "thanks!",
     "cheers", "lol", "btw", "fyi", "np", "gonna", "wanna",
-]
+)
 
 # ---------------------------------------------------------------------------
 # Entity extraction regex
@@ -82,17 +82,32 @@ _ROUTING_RE = re.compile(
 _ACCOUNT_RE = re.compile(
     r"(?:account|acct)[^\d]{0,20}(\d{8,17})\b", re.IGNORECASE,
 )
-#: Regex for bank names (common pattern: "Bank: <Name>").
+#: Case-sensitive twins of the two above, run against lowercased ASCII text.
+#: Their captures are digits only, so case doesn't matter, and dropping
+#: IGNORECASE makes the scan several times cheaper. Non-ASCII text keeps the
+#: IGNORECASE versions: lower() can change its length, and case folding
+#: matches more than lower() produces.
+_ROUTING_LOWER_RE = re.compile(_ROUTING_RE.pattern)
+_ACCOUNT_LOWER_RE = re.compile(_ACCOUNT_RE.pattern)
+#: Regex for bank names (common pattern: "Bank: <Name>"). Matched against
+#: the original text so the captured name keeps its case.
 _BANK_NAME_RE = re.compile(
     r"(?:bank)[:\s]+([A-Z][A-Za-z\s&'.]{2,30})", re.IGNORECASE,
 )
 
+#: Literal words each entity regex needs (ASCII text only — case folding can
+#: match non-ASCII look-alikes). Most emails contain none of them, and a
+#: substring check is far cheaper than letting the regex engine try every
+#: position of the body.
+_ROUTING_TRIGGERS = ("routing", "aba", "transit")
+_ACCOUNT_TRIGGERS = ("account", "acct")
+
 
 # ---------------------------------------------------------------------------
 # Scanner
 # ---------------------------------------------------------------------------
 
-def _count_keyword_hits(text_lower: str, keywords: list[str]) -> int:
+def _count_keyword_hits(text_lower: str, keywords: tuple[str, ...]) -> int:
     """Count how many distinct keywords appear in the text."""
     return sum(1 for kw in keywords if kw in text_lower)
 
@@ -106,12 +121,24 @@ def _scan_content_signals(text: str) -> ContentSignals:
     text_lower = text.lower()
 
     # --- Financial entity extraction ---
-    for m in _ROUTING_RE.finditer(text):
-        cs.financial_entities.append(f"routing:{m.group(1)}")
-    for m in _ACCOUNT_RE.finditer(text):
-        cs.financial_entities.append(f"account:{m.group(1)}")
-    for m in _BANK_NAME_RE.finditer(text):
-        cs.financial_entities.append(f"bank:{m.group(1).strip()}")
+    if text.isascii():
+        # Fast path: skip each regex whose trigger words are absent
+        if any(t in text_lower for t in _ROUTING_TRIGGERS):
+            for m in _ROUTING_LOWER_RE.finditer(text_lower):
+                cs.financial_entities.append(f"routing:{m.group(1)}")
+        if any(t in text_lower for t in _ACCOUNT_TRIGGERS):
+            for m in _ACCOUNT_LOWER_RE.finditer(text_lower):
+                cs.financial_entities.append(f"account:{m.group(1)}")
+        if "bank" in text_lower:
+            for m in _BANK_NAME_RE.finditer(text):
+                cs.financial_entities.append(f"bank:{m.group(1).strip()}")
+    else:
+        for m in _ROUTING_RE.finditer(text):
+            cs.financial_entities.append(f"routing:{m.group(1)}")
+        for m in _ACCOUNT_RE.finditer(text):
+            cs.financial_entities.append(f"account:{m.group(1)}")
+        for m in _BANK_NAME_RE.finditer(text):
+            cs.financial_entities.append(f"bank:{m.group(1).strip()}")
     cs.has_financial_entities = len(cs.financial_entities) > 0
 
     # --- Keyword category flags ---
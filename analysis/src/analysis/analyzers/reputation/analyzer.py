@@ -246,6 +246,7 @@ class ReputationAnalyzer(BaseAnalyzer):
     name = "reputation"
     description = "Queries multiple DNSBLs for IP and Domain reputation"
     order = 15  # after header_auth (10), before url_check (20)
+    parallelizable = True  # blocks on DNSBL lookups
 
     def analyze(self, email: EmailEvent) -> AnalysisResult:
         observations: list[Observation] = []
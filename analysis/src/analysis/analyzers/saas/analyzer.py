@@ -40,57 +40,39 @@ Observations produced:
 """
 import json
 import logging
-import re
-from html.parser import HTMLParser
+import sys
+from functools import lru_cache
 from pathlib import Path
 
 from analysis.analyzers._base import BaseAnalyzer
+from analysis.analyzers._nlp import get_nlp_classifier as _get_nlp_classifier
+from analysis.analyzers._text import strip_html
 from analysis.models import AnalysisResult, EmailEvent, Observation
 
 logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# HTML text extraction
+# Vendor dataset — loaded once per worker process
 # ---------------------------------------------------------------------------
-class _HTMLTextExtractor(HTMLParser):
-    """Extract plain text from HTML, stripping all tags."""
-    def __init__(self):
-        super().__init__()
-        self._text = []
-        self._skip = False
-
-    def handle_starttag(self, tag, attrs):
-        if tag in ("style", "script", "head"):
-            self._skip = True
-
-    def handle_endtag(self, tag):
-        if tag in ("style", "script", "head"):
-            self._skip = False
-
-    def handle_data(self, data):
-        if not self._skip:
-            self._text.append(data)
-
-    def get_text(self) -> str:
-        return " ".join(self._text)
-
+_VENDOR_DATA = None
 
-def _strip_html(html: str) -> str:
-    """Convert HTML to plain text."""
-    extractor = _HTMLTextExtractor()
-    try:
-        extractor.feed(html)
-        text = extractor.get_text()
-    except Exception:
-        text = re.sub(r"<[^>]+>", " ", html)
-    return re.sub(r"\s+", " ", text).strip()
 
+def _intern_vendor_data(data: dict) -> dict:
+    """Share one string object per app id and category across the catalog.
 
-# ---------------------------------------------------------------------------
-# Vendor dataset — loaded once per worker process
-# ---------------------------------------------------------------------------
-_VENDOR_DATA = None
+    json.load builds a fresh str for every occurrence, but a handful of
+    app ids back thousands of domain_index entries and a few dozen
+    categories cover every app.
+    """
+    data["domain_index"] = {
+        domain: sys.intern(app_id)
+        for domain, app_id in data.get("domain_index", {}).items()
+    }
+    for app in data.get("apps", {}).values():
+        if isinstance(app.get("category"), str):
+            app["category"] = sys.intern(app["category"])
+    return data
 
 
 def _load_vendor_data():
@@ -99,7 +81,7 @@ def _load_vendor_data():
         data_path = Path(__file__).parent.parent.parent / "data" / "saas_vendors.json"
         try:
             with open(data_path) as f:
-                _VENDOR_DATA = json.load(f)
+                _VENDOR_DATA = _intern_vendor_data(json.load(f))
             app_count = _VENDOR_DATA.get("_meta", {}).get("app_count", 0)
             domain_count = _VENDOR_DATA.get("_meta", {}).get("domain_count", 0)
             logger.info(
@@ -115,32 +97,6 @@ def _load_vendor_data():
     return _VENDOR_DATA
 
 
-# ---------------------------------------------------------------------------
-# NLP classifier — lazy-loaded once per worker
-# ---------------------------------------------------------------------------
-_nlp_classifier = None
-
-
-def _get_nlp_classifier():
-    global _nlp_classifier
-    if _nlp_classifier is None:
-        try:
-            from transformers import pipeline
-            logger.info("Loading zero-shot classification model...")
-            _nlp_classifier = pipeline(
-                "zero-shot-classification",
-                model="cross-encoder/nli-distilroberta-base",
-                device=-1,
-            )
-            logger.info("NLP model loaded successfully")
-        except Exception as exc:
-            logger.warning("Failed to load NLP model: %s. Falling back to headers only.", exc)
-            _nlp_classifier = False
-    return _nlp_classifier if _nlp_classifier is not False else None
-
-
-
-
 _MARKETING_MAILERS = frozenset({
     "mailchimp", "sendgrid", "marketo", "hubspot",
     "pardot", "constant contact", "brevo", "mailgun",
@@ -171,6 +127,49 @@ def _extract_root_domain(domain: str) -> str:
     return ".".join(parts[-2:])
 
 
+def _label_suffixes(domain: str):
+    """Yield the domain and each parent above it, stopping before the bare TLD.
+
+    'a.mail.github.com' → 'a.mail.github.com', 'mail.github.com', 'github.com'
+    """
+    start = 0
+    while True:
+        dot = domain.find(".", start)
+        if dot == -1:
+            return
+        yield domain[start:]
+        start = dot + 1
+
+
+@lru_cache(maxsize=4096)
+def _vendor_observations(domain: str) -> tuple[Observation, ...]:
+    """Provider observations for a sender domain (empty if not a known vendor).
+
+    Senders repeat heavily (notifications@github.com, no-reply@slack.com...),
+    and Observations are immutable, so the result is cached per domain.
+    """
+    vendor_data = _load_vendor_data()
+    domain_index = vendor_data.get("domain_index", {})
+    apps = vendor_data.get("apps", {})
+
+    # Walk up the domain hierarchy for a match — one dict probe per label
+    app_id = None
+    for candidate in _label_suffixes(domain):
+        if candidate in domain_index:
+            app_id = domain_index[candidate]
+            break
+
+    if app_id and app_id in apps:
+        app = apps[app_id]
+        return (
+            Observation(key="provider", value=app.get("name", ""), type="text"),
+            Observation(key="provider_category", value=app.get("category", ""), type="text"),
+            Observation(key="provider_org", value=app.get("organization", "unknown"), type="text"),
+        )
+
+    return ()
+
+
 # ---------------------------------------------------------------------------
 # Analyzer
 # ---------------------------------------------------------------------------
@@ -186,6 +185,7 @@ class SaaSUsageAnalyzer(BaseAnalyzer):
     name = "saas_usage"
     description = "Identifies SaaS senders and classifies email as usage vs marketing"
     order = 50  # NLP — most expensive, runs last
+    parallelizable = True  # NLP inference
 
     def analyze(self, email: EmailEvent) -> AnalysisResult:
         observations = []
@@ -260,30 +260,7 @@ class SaaSUsageAnalyzer(BaseAnalyzer):
         if not sender:
             return []
 
-        vendor_data = _load_vendor_data()
-        domain_index = vendor_data.get("domain_index", {})
-        apps = vendor_data.get("apps", {})
-
-        domain = sender.lower().split("@")[-1] if "@" in sender else sender.lower()
-
-        # Walk up the domain hierarchy for a match
-        app_id = None
-        parts = domain.split(".")
-        for i in range(len(parts) - 1):
-            candidate = ".".join(parts[i:])
-            if candidate in domain_index:
-                app_id = domain_index[candidate]
-                break
-
-        if app_id and app_id in apps:
-            app = apps[app_id]
-            return [
-                Observation(key="provider", value=app.get("name", ""), type="text"),
-                Observation(key="provider_category", value=app.get("category", ""), type="text"),
-                Observation(key="provider_org", value=app.get("organization", "unknown"), type="text"),
-            ]
-
-        return []
+        return list(_vendor_observations(sender.rpartition("@")[2].lower()))
 
 
     # ----- NLP classification -----
@@ -296,7 +273,7 @@ class SaaSUsageAnalyzer(BaseAnalyzer):
 
         body_text = email.body.content or ""
         if email.body.content_type == "html" or "<" in body_text[:50]:
-            body_text = _strip_html(body_text)
+            body_text = strip_html(body_text)
 
         text = f"Subject: {email.subject or '(no subject)'}\n\n"
         text += body_text[:500]
@@ -26,29 +26,48 @@ Observations produced:
     excessive_subdomains (numeric) — count of URLs with >4 subdomain levels
 """
 import re
-from urllib.parse import urlparse
 
 from analysis.analyzers._base import BaseAnalyzer
 from analysis.models import AnalysisResult, EmailEvent, Observation
 
 
-SUSPICIOUS_TLDS = {
+SUSPICIOUS_TLDS = frozenset({
     ".xyz", ".top", ".club", ".work", ".click", ".loan",
     ".gq", ".ml", ".cf", ".tk", ".ga", ".buzz", ".surf",
-}
+})
 
-SHORTENERS = {
+SHORTENERS = frozenset({
     "bit.ly", "tinyurl.com", "t.co", "goo.gl", "ow.ly",
     "is.gd", "buff.ly", "rebrand.ly", "cutt.ly",
+})
+
+HOMOGLYPH_BRANDS = {
+    "paypal": "paypal.com",
+    "microsoft": "microsoft.com",
+    "apple": "apple.com",
+    "google": "google.com",
+    "amazon": "amazon.com",
+    "netflix": "netflix.com",
+    "facebook": "facebook.com",
+    "instagram": "instagram.com",
 }
 
+HOMOGLYPH_SUBSTITUTIONS = (
+    ("0", "o"), ("1", "l"), ("l", "i"), ("rn", "m"),
+    ("vv", "w"), ("5", "s"), ("3", "e"),
+)
+
+# One match per URL; group 1 captures the authority (netloc) so the host
+# comes out of the same scan instead of a urlparse() per URL.
 URL_PATTERN = re.compile(
-    r'https?://[^\s<>"\')\]]+',
+    r'https?://(?=[^\s<>"\')\]])([^\s<>"\')\]/?#]*)[^\s<>"\')\]]*',
     re.IGNORECASE,
 )
 
 IP_PATTERN = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
 
+_NO_URLS = Observation(key="urls_found", value=0, type="numeric")
+
 
 class URLAnalyzer(BaseAnalyzer):
     """Check URLs in the email body for phishing indicators."""
@@ -59,13 +78,19 @@ class URLAnalyzer(BaseAnalyzer):
 
     def analyze(self, email: EmailEvent) -> AnalysisResult:
         body_text = email.body.content or ""
-        urls = URL_PATTERN.findall(body_text)
+
+        # Every match needs "://" — a plain substring test rules out
+        # link-free bodies without starting the regex engine.
+        if "://" not in body_text:
+            return AnalysisResult(analyzer=self.name, observations=[_NO_URLS])
+
+        netlocs = URL_PATTERN.findall(body_text)
 
         observations = [
-            Observation(key="urls_found", value=len(urls), type="numeric"),
+            Observation(key="urls_found", value=len(netlocs), type="numeric"),
         ]
 
-        if not urls:
+        if not netlocs:
             return AnalysisResult(analyzer=self.name, observations=observations)
 
         ip_urls = 0
@@ -74,24 +99,23 @@ class URLAnalyzer(BaseAnalyzer):
         homoglyph_domains = []
         excessive_subs = 0
 
-        for url in urls:
-            try:
-                parsed = urlparse(url)
-                hostname = parsed.hostname or ""
-                hostname_lower = hostname.lower()
-            except Exception:
+        for netloc in netlocs:
+            # Same host urlparse() would give: drop userinfo and port.
+            # Bracketed IPv6 hosts can't be complete here (the URL pattern
+            # stops at "]"), which urlparse rejected — skip them likewise.
+            if "[" in netloc:
                 continue
+            hostname_lower = netloc.rpartition("@")[2].partition(":")[0].lower()
 
             # IP address URLs
-            if IP_PATTERN.match(hostname):
+            if IP_PATTERN.match(hostname_lower):
                 ip_urls += 1
 
-            # Suspicious TLDs
-            for tld in SUSPICIOUS_TLDS:
-                if hostname_lower.endswith(tld):
-                    if tld not in suspicious_tlds:
-                        suspicious_tlds.append(tld)
-                    break
+            # Suspicious TLDs — one set lookup on the last label
+            _, dot, last_label = hostname_lower.rpartition(".")
+            tld = dot + last_label
+            if tld in SUSPICIOUS_TLDS and tld not in suspicious_tlds:
+                suspicious_tlds.append(tld)
 
             # Shorteners
             if hostname_lower in SHORTENERS:
@@ -128,24 +152,10 @@ class URLAnalyzer(BaseAnalyzer):
         return AnalysisResult(analyzer=self.name, observations=observations)
 
     def _check_homoglyphs(self, hostname: str) -> str:
-        brands = {
-            "paypal": "paypal.com",
-            "microsoft": "microsoft.com",
-            "apple": "apple.com",
-            "google": "google.com",
-            "amazon": "amazon.com",
-            "netflix": "netflix.com",
-            "facebook": "facebook.com",
-            "instagram": "instagram.com",
-        }
-        substitutions = {
-            "0": "o", "1": "l", "l": "i", "rn": "m",
-            "vv": "w", "5": "s", "3": "e",
-        }
         normalised = hostname
-        for fake, real in substitutions.items():
+        for fake, real in HOMOGLYPH_SUBSTITUTIONS:
             normalised = normalised.replace(fake, real)
-        for brand, domain in brands.items():
+        for brand, domain in HOMOGLYPH_BRANDS.items():
             if brand in normalised and brand not in hostname:
                 return domain
         return ""
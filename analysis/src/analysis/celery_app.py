@@ -19,11 +19,43 @@ Configures the Celery worker that processes email analysis tasks.
 Uses shared defaults from ices_shared.celery_defaults with
 analysis-specific task routing.
 """
+import logging
 import os
+
+import orjson
 from celery import Celery
+from celery.signals import worker_process_init
+from kombu.serialization import register
+from kombu.utils import json as kombu_json
 
 from ices_shared.celery_defaults import CELERY_DEFAULTS
 
+logger = logging.getLogger(__name__)
+
+
+def _loads_json(payload):
+    """Decode task bodies with orjson.
+
+    Kombu's own decoder is only needed for its {"__type__": ...} markers
+    (datetimes, UUIDs, bytes), which ingestion never sends — fall back to it
+    only when a payload actually contains one.
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        payload = bytes(payload)
+        if b'"__type__"' in payload:
+            return kombu_json.loads(payload)
+    elif '"__type__"' in payload:
+        return kombu_json.loads(payload)
+    return orjson.loads(payload)
+
+
+# Every email event is decoded here once per message, so swap in orjson for
+# the 'json' codec. Encoding keeps kombu's encoder for full type support.
+register(
+    "json", kombu_json.dumps, _loads_json,
+    content_type="application/json", content_encoding="utf-8",
+)
+
 app = Celery("analysis")
 
 # Start with shared defaults, then apply analysis-specific overrides
@@ -33,9 +65,35 @@ config.update({
     "task_routes": {
         "analysis.tasks.analyze_email": {"queue": "emails"},
     },
+
+    # analyze_email latency varies from milliseconds to seconds (NLP, DB
+    # lookups). Prefetch is already 1 via the shared defaults; together with
+    # -Ofair on the worker command line a child only receives an email when
+    # it is idle, so one slow message can't strand others behind it.
+    # No analysis task is rate-limited, so skip the rate-limit bookkeeping.
+    "worker_disable_rate_limits": True,
+
+    # Each child loads the NLP model in worker_process_init (below); allow
+    # for that instead of the default 4s before the parent gives up on it.
+    "worker_proc_alive_timeout": 60,
 })
 
 app.config_from_object(config)
 
+
+@worker_process_init.connect
+def _warm_up(**kwargs):
+    """Load the NLP model and open DB connections once per worker process,
+    so the first email a child handles doesn't pay for either."""
+    from analysis.analyzers._nlp import warm_up
+    warm_up()
+
+    try:
+        from ices_shared.db import warm_pool
+        warm_pool()
+    except Exception as exc:
+        logger.warning("Postgres pool warm-up failed (non-fatal): %s", exc)
+
+
 # Auto-discover tasks in the analysis package
 app.autodiscover_tasks(["analysis"])
@@ -35,7 +35,7 @@ from ices_shared.models import (
 # EmailEvent — pipeline-specific input model
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class EmailEvent:
     """
     A fully parsed email entering the analysis pipeline.
@@ -21,13 +21,78 @@ Orchestrates analysis of an email:
 3. Returns a Verdict with all results
 """
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from analysis.analyzers import discover_analyzers
+from analysis.analyzers._base import BaseAnalyzer
 from analysis.models import EmailEvent, AnalysisResult, Observation, Verdict
 
 logger = logging.getLogger(__name__)
 
+# Threads for analyzers marked parallelizable (DNS, DB, NLP inference)
+ANALYZER_THREADS = int(os.environ.get("ANALYZER_THREADS", "4"))
+
+# ---------------------------------------------------------------------------
+# Per-process state — analyzers are discovered once per worker process
+# (restart the workers to pick up a new analyzer), and the thread pool is
+# created on first use so each prefork child gets its own.
+# ---------------------------------------------------------------------------
+_analyzers = None
+_executor = None
+
+
+def _get_analyzers() -> list[BaseAnalyzer]:
+    global _analyzers
+    if _analyzers is None:
+        _analyzers = discover_analyzers()
+    return _analyzers
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=ANALYZER_THREADS, thread_name_prefix="analyzer",
+        )
+    return _executor
+
+
+def _run_analyzer(analyzer: BaseAnalyzer, email: EmailEvent) -> AnalysisResult:
+    """Run one analyzer, timing it and turning a crash into an error result."""
+    t0 = time.monotonic_ns()
+    try:
+        result = analyzer.analyze(email)
+        elapsed_ms = (time.monotonic_ns() - t0) / 1_000_000
+        result.processing_time_ms = elapsed_ms
+
+        # The observation summary is the costly part of this log line —
+        # only build it when INFO is actually emitted.
+        if logger.isEnabledFor(logging.INFO):
+            obs_summary = ", ".join(
+                f"{o.key}={o.value}" for o in result.observations
+            )
+            logger.info(
+                "Analyzer '%s': %d observations [%s] (%.1fms)",
+                analyzer.name, len(result.observations), obs_summary,
+                elapsed_ms,
+            )
+        return result
+    except Exception as exc:
+        elapsed_ms = (time.monotonic_ns() - t0) / 1_000_000
+        logger.exception(
+            "Analyzer '%s' failed (%.1fms): %s", analyzer.name,
+            elapsed_ms, exc,
+        )
+        return AnalysisResult(
+            analyzer=analyzer.name,
+            observations=[
+                Observation(key="error", value=str(exc), type="text"),
+            ],
+            processing_time_ms=elapsed_ms,
+        )
+
 
 def run_pipeline(email: EmailEvent) -> Verdict:
     """
@@ -35,45 +100,32 @@ def run_pipeline(email: EmailEvent) -> Verdict:
 
     Each analyzer runs independently and returns typed observations.
     No score aggregation — consumers (policy engine) interpret results.
+
+    Analyzers marked ``parallelizable`` are submitted to a thread pool up
+    front; the rest run inline on this thread meanwhile. Results are always
+    returned in analyzer order.
     """
-    analyzers = discover_analyzers()
+    analyzers = _get_analyzers()
     logger.info(
         "Running %d analyzers on message %s (order: %s)",
         len(analyzers), email.message_id,
         ", ".join(f"{a.name}({a.order})" for a in analyzers),
     )
 
-    results: list[AnalysisResult] = []
-
-    for analyzer in analyzers:
-        try:
-            t0 = time.monotonic()
-            result = analyzer.analyze(email)
-            elapsed_ms = (time.monotonic() - t0) * 1000
-            result.processing_time_ms = elapsed_ms
-            results.append(result)
-
-            obs_summary = ", ".join(
-                f"{o.key}={o.value}" for o in result.observations
-            )
-            logger.info(
-                "Analyzer '%s': %d observations [%s] (%.1fms)",
-                analyzer.name, len(result.observations), obs_summary,
-                elapsed_ms,
-            )
-        except Exception as exc:
-            elapsed_ms = (time.monotonic() - t0) * 1000
-            logger.exception(
-                "Analyzer '%s' failed (%.1fms): %s", analyzer.name,
-                elapsed_ms, exc,
-            )
-            results.append(AnalysisResult(
-                analyzer=analyzer.name,
-                observations=[
-                    Observation(key="error", value=str(exc), type="text"),
-                ],
-                processing_time_ms=elapsed_ms,
-            ))
+    # Start the slow, GIL-releasing analyzers first, run the cheap ones
+    # inline while those are in flight, then collect in analyzer order.
+    futures = [
+        _get_executor().submit(_run_analyzer, a, email) if a.parallelizable else None
+        for a in analyzers
+    ]
+    inline = [
+        _run_analyzer(a, email) if f is None else None
+        for a, f in zip(analyzers, futures)
+    ]
+    results: list[AnalysisResult] = [
+        r if f is None else f.result()
+        for f, r in zip(futures, inline)
+    ]
 
     # Extract recipients for policy engine matching
     recipients = [r.address for r in email.to] if email.to else []
@@ -18,12 +18,21 @@ BlackChamber ICES Analysis Engine — Celery Tasks
 Dual-write: analysis results go to both Redis (for real-time policy eval)
 and Postgres (for reporting/audit).
 """
-import json
 import logging
 
+import orjson
+
+from ices_shared.db import (
+    get_connection,
+    is_message_processed,
+    store_verdict,
+)
+
+from analysis.analyzers.bec.analyzer import update_behavioral_profiles
 from analysis.celery_app import app
 from analysis.models import EmailEvent
 from analysis.pipeline import run_pipeline
+from analysis.verdict_buffer import publish_verdict
 
 logger = logging.getLogger(__name__)
 
@@ -34,78 +43,86 @@ logger = logging.getLogger(__name__)
     max_retries=3,
     default_retry_delay=10,
     acks_late=True,
+    # Nothing reads analyze_email results back — the verdict is handed on
+    # via the verdicts queue — so skip the result-backend writes.
+    ignore_result=True,
 )
-def analyze_email(self, email_event_json: str):
+def analyze_email(self, event_data):
     """
     Analyze an email event, persist results, and publish for policy evaluation.
 
     Dual-write:
     1. Postgres — system of record (email_events + analysis_results)
     2. Redis queue — real-time policy evaluation
+
+    Args:
+        event_data: Email event dict, decoded once by Celery from the task
+            body. A JSON string is still accepted for messages published
+            before ingestion switched to sending the object directly.
     """
     try:
-        event_data = json.loads(email_event_json)
-        email = EmailEvent.from_dict(event_data)
-
-        logger.info(
-            "Analyzing email: message_id=%s tenant=%s from=%s subject=%s",
-            email.message_id, email.tenant_alias or email.tenant_id,
-            email.sender, email.subject,
-        )
+        if isinstance(event_data, (str, bytes)):
+            event_data = orjson.loads(event_data)
+        message_id = event_data.get("message_id", "")
 
-        # Skip if already processed — saves bandwidth
+        # Skip if already processed — checked before building the EmailEvent
+        # so duplicates don't pay for parsing recipients and attachments
         try:
-            from ices_shared.db import get_connection, is_message_processed
             with get_connection() as conn:
-                if is_message_processed(conn, email.message_id):
-                    logger.info("Skipping already-processed message: %s", email.message_id)
-                    return {"message_id": email.message_id, "status": "already_processed"}
+                if is_message_processed(conn, message_id):
+                    logger.info("Skipping already-processed message: %s", message_id)
+                    return {"message_id": message_id, "status": "already_processed"}
         except Exception:
             pass  # If DB check fails, proceed with processing
 
+        email = EmailEvent.from_dict(event_data)
+
+        # Per-email log lines are gated so their arguments aren't even
+        # evaluated when INFO is off.
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info(
+                "Analyzing email: message_id=%s tenant=%s from=%s subject=%s",
+                email.message_id, email.tenant_alias or email.tenant_id,
+                email.sender, email.subject,
+            )
+
         # Run all analyzers
         verdict = run_pipeline(email)
+        # run_pipeline already sets the subject on the verdict, so the
+        # serialized dict carries it for Postgres storage.
         verdict_dict = verdict.to_dict()
 
-        # Include subject in dict for Postgres storage
-        verdict_dict["subject"] = email.subject
-
         # --- Dual-write: Postgres (best-effort) ---
         try:
-            from ices_shared.db import get_connection, store_email_event, store_analysis_results
             with get_connection() as conn:
-                event_id = store_email_event(conn, verdict_dict)
-                store_analysis_results(conn, event_id, verdict_dict)
-                conn.commit()
-            logger.info("Persisted results to Postgres (event_id=%d)", event_id)
+                event_id = store_verdict(conn, verdict_dict)
+            if log_info:
+                logger.info("Persisted results to Postgres (event_id=%d)", event_id)
         except Exception as db_exc:
             logger.warning("Postgres write failed (non-fatal): %s", db_exc)
 
+        # --- Dual-write: Redis queue (buffered, flushed in batches) ---
+        # Raises while the broker is unreachable so the task is retried; do
+        # this before the profile update so a retry doesn't count the email twice.
+        publish_verdict(verdict_dict)
+
         # --- Update BEC behavioral models (best-effort, non-fatal) ---
         try:
-            from analysis.analyzers.bec.analyzer import update_behavioral_profiles
             update_behavioral_profiles(email, verdict)
         except Exception as bec_exc:
             logger.warning("BEC profile update failed (non-fatal): %s", bec_exc)
 
-        # --- Dual-write: Redis queue ---
-        app.send_task(
-            "verdict.tasks.execute_verdict",
-            args=[json.dumps(verdict_dict)],
-            queue="verdicts",
-        )
-
-        logger.info(
-            "Verdict published: message_id=%s results=%d",
-            verdict.message_id, len(verdict.results),
-        )
+        if log_info:
+            logger.info(
+                "Verdict queued: message_id=%s results=%d",
+                verdict.message_id, len(verdict.results),
+            )
 
-        return {
-            "message_id": verdict.message_id,
-            "analyzers": [r.analyzer for r in verdict.results],
-        }
+        # Shown in the worker's "succeeded" log line; not stored (ignore_result)
+        return verdict.to_summary()
 
-    except json.JSONDecodeError as exc:
+    except orjson.JSONDecodeError as exc:
         logger.error("Invalid JSON in email event: %s", exc)
         raise
 
@@ -13,11 +13,17 @@
 # limitations under the License.
 
 """Tests for individual analyzers — observation model."""
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
 from analysis.models import EmailEvent, EmailBody, Attachment, Observation
 from analysis.analyzers.header.analyzer import HeaderAnalyzer
 from analysis.analyzers.url.analyzer import URLAnalyzer
 from analysis.analyzers.attachment.analyzer import AttachmentAnalyzer
+from analysis.analyzers import _nlp
+from analysis.analyzers._text import strip_html
 
 
 def _make_email(**kwargs) -> EmailEvent:
@@ -58,6 +64,31 @@ class TestHeaderAnalyzer:
         assert result.get("dkim") == "pass"
         assert result.get("dmarc") == "pass"
 
+    def test_realistic_all_pass_header_takes_fast_path(self):
+        email = _make_email(headers={"Authentication-Results": (
+            "mx.google.com; dkim=pass header.i=@example.com header.s=s1 "
+            "header.b=AbC123; spf=pass (google.com: domain of bounce@example.com "
+            "designates 203.0.113.5 as permitted sender) smtp.mailfrom=bounce@example.com; "
+            "dmarc=pass (p=REJECT sp=REJECT dis=NONE) header.from=example.com"
+        )})
+        with patch.object(HeaderAnalyzer, "_auth_observations") as full_parse:
+            result = self.analyzer.analyze(email)
+        full_parse.assert_not_called()
+        assert result.get("spf") == "pass"
+        assert result.get("dkim") == "pass"
+        assert result.get("dmarc") == "pass"
+
+    def test_mixed_dkim_signatures_take_full_parse(self):
+        """A failing second signature keeps the header off the fast path."""
+        email = _make_email(headers={"Authentication-Results": (
+            "mx.example.com; dkim=pass header.d=example.com; "
+            "dkim=fail header.d=evil.test; spf=pass smtp.mailfrom=example.com; "
+            "dmarc=pass header.from=example.com"
+        )})
+        result = self.analyzer.analyze(email)
+        assert result.get("spf") == "pass"
+        assert result.get("dkim") == "fail"
+
     def test_spf_fail(self):
         email = _make_email(headers={
             "Authentication-Results": "spf=fail dkim=pass dmarc=pass"
@@ -250,3 +281,74 @@ class TestSaaSUsageAnalyzer:
         assert result.get("category") is None
         assert result.get("confidence") is None
 
+    def test_label_suffixes_stop_before_tld(self):
+        from analysis.analyzers.saas.analyzer import _label_suffixes
+        assert list(_label_suffixes("a.mail.github.com")) == [
+            "a.mail.github.com", "mail.github.com", "github.com",
+        ]
+        assert list(_label_suffixes("localhost")) == []
+
+
+
+class TestStripHtml:
+    def setup_method(self):
+        strip_html.cache_clear()
+
+    def test_drops_script_and_style(self):
+        html = "<html><head><title>x</title></head><style>p{}</style><p>Hello <b>there</b></p><script>evil()</script></html>"
+        assert strip_html(html) == "Hello there"
+
+    def test_same_body_is_stripped_once(self):
+        html = "<p>Invoice attached</p>"
+        strip_html(html)
+        strip_html(html)
+        info = strip_html.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+
+class TestNlpClassifierLoad:
+    def setup_method(self):
+        _nlp._nlp_classifier = None
+
+    def teardown_method(self):
+        _nlp._nlp_classifier = None
+
+    def test_concurrent_callers_load_once(self):
+        calls = []
+
+        def slow_load():
+            calls.append(1)
+            time.sleep(0.05)
+            _nlp._nlp_classifier = "classifier"
+
+        with patch("analysis.analyzers._nlp._load_classifier", side_effect=slow_load):
+            threads = [
+                threading.Thread(target=_nlp.get_nlp_classifier) for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert len(calls) == 1
+        assert _nlp.get_nlp_classifier() == "classifier"
+
+    def test_failed_load_is_not_retried(self):
+        def fail():
+            _nlp._nlp_classifier = False
+
+        with patch("analysis.analyzers._nlp._load_classifier", side_effect=fail) as load:
+            assert _nlp.get_nlp_classifier() is None
+            assert _nlp.get_nlp_classifier() is None
+        load.assert_called_once()
+
+    def test_warm_up_runs_one_inference(self):
+        calls = []
+        _nlp._nlp_classifier = lambda text, labels, **kw: calls.append(text)
+        _nlp.warm_up()
+        assert len(calls) == 1
+
+    def test_warm_up_without_model_is_noop(self):
+        _nlp._nlp_classifier = False
+        _nlp.warm_up()
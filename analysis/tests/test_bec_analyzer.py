@@ -15,9 +15,11 @@
 """Tests for the BEC detection analyzer — all DB and NLP calls mocked."""
 import pytest
 from datetime import datetime, timezone, timedelta
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
 
-from analysis.models import EmailEvent, EmailBody, EmailAddress, Observation
+from analysis.models import (
+    AnalysisResult, EmailEvent, EmailBody, EmailAddress, Observation, Verdict,
+)
 from analysis.analyzers.bec.models import (
     SenderProfile,
     SenderRecipientPair,
@@ -36,7 +38,9 @@ from analysis.analyzers.bec.analyzer import (
     _detect_time_anomaly,
     _detect_context_escalation,
     _sender_domain,
+    update_behavioral_profiles,
 )
+from analysis.analyzers.bec.cache import TTLCache
 from analysis.analyzers.bec.signals import _scan_content_signals
 
 
@@ -61,6 +65,13 @@ def _make_email(**kwargs) -> EmailEvent:
     return EmailEvent(**defaults)
 
 
+def _fake_classifier(label: str, score: float):
+    """Stand-in for the zero-shot pipeline that always picks one label."""
+    def classify(text, *args, **kwargs):
+        return {"labels": [label], "scores": [score]}
+    return classify
+
+
 def _make_profile(**kwargs) -> SenderProfile:
     defaults = {
         "tenant_id": "tenant-001",
@@ -236,6 +247,19 @@ class TestSenderProfile:
         profile = _make_profile(typical_categories={})
         assert profile.dominant_category is None
 
+    def test_send_hour_stats(self):
+        profile = _make_profile(typical_send_hours={"9": 2, "11": 2})
+        assert profile.send_hour_stats == (4, 10.0, 1.0)
+        assert _make_profile(typical_send_hours={}).send_hour_stats == (0, 0.0, 1.0)
+
+    def test_anomalous_hours(self):
+        profile = _make_profile(
+            typical_send_hours={"9": 30, "10": 25, "11": 20, "14": 15, "15": 10},
+        )
+        assert 3 in profile.anomalous_hours
+        assert 10 not in profile.anomalous_hours
+        assert _make_profile(typical_send_hours={"10": 3}).anomalous_hours == frozenset()
+
 
 class TestSenderRecipientPair:
     def test_first_contact_zero(self):
@@ -288,6 +312,37 @@ class TestBECAnalyzer:
         assert result.get("sender_tenure_days") > 0
         assert result.get("bec_risk_level") == "low"
 
+    @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_profile")
+    @patch("analysis.analyzers.bec.analyzer._get_nlp_classifier")
+    def test_routine_mail_skips_nlp(self, mock_nlp_fn, mock_profile, mock_pair, mock_dpair):
+        """Plain text from an established low-risk sender never reaches NLP."""
+        mock_profile.return_value = _make_profile()
+        email = _make_email(subject="Notes from Tuesday", body=EmailBody(
+            content_type="text", content="See you at the review on Thursday.",
+        ))
+        result = self.analyzer.analyze(email)
+        mock_nlp_fn.assert_not_called()
+        assert result.get("intent_category") == "informational"
+        assert result.get("intent_confidence") == 70
+        assert result.get("intent_source") == "skipped"
+
+    @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_profile", return_value=None)
+    @patch("analysis.analyzers.bec.analyzer._get_nlp_classifier")
+    def test_unknown_sender_always_classified(self, mock_nlp_fn, mock_profile, mock_pair, mock_dpair):
+        """Without sender history the model runs even on plain text."""
+        mock_nlp_fn.return_value = _fake_classifier(NLP_CANDIDATE_LABELS[3], 0.8)
+        email = _make_email(subject="Notes from Tuesday", body=EmailBody(
+            content_type="text", content="See you at the review on Thursday.",
+        ))
+        result = self.analyzer.analyze(email)
+        mock_nlp_fn.assert_called_once()
+        assert result.get("intent_category") == "authority_impersonation"
+        assert result.get("intent_source") == "nlp"
+
     @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
     @patch.object(BECAnalyzer, "_get_pair", return_value=None)
     @patch.object(BECAnalyzer, "_get_profile")
@@ -295,12 +350,7 @@ class TestBECAnalyzer:
     def test_category_shift_detected(self, mock_nlp_fn, mock_profile, mock_pair, mock_dpair):
         """Known sender sends a rare financial request → category shift."""
         # NLP returns "financial_request"
-        mock_classifier = MagicMock()
-        mock_classifier.return_value = {
-            "labels": [NLP_CANDIDATE_LABELS[1]],  # financial_request
-            "scores": [0.92],
-        }
-        mock_nlp_fn.return_value = mock_classifier
+        mock_nlp_fn.return_value = _fake_classifier(NLP_CANDIDATE_LABELS[1], 0.92)
 
         mock_profile.return_value = _make_profile(
             typical_categories={"informational": 95, "financial_request": 1},
@@ -311,6 +361,21 @@ class TestBECAnalyzer:
         assert result.get("category_shift") is True
         assert result.get("bec_risk_score") > 25
 
+    @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_pair", return_value=None)
+    @patch.object(BECAnalyzer, "_get_profile")
+    @patch("analysis.analyzers.bec.analyzer._get_nlp_classifier")
+    def test_routine_heavy_sender_category_shift(self, mock_nlp_fn, mock_profile, mock_pair, mock_dpair):
+        """A sender whose history is mostly gated routine mail still shifts on a rare request."""
+        mock_nlp_fn.return_value = _fake_classifier(NLP_CANDIDATE_LABELS[1], 0.92)
+        mock_profile.return_value = _make_profile(
+            typical_categories={"informational": 190, "transactional": 6, "financial_request": 4},
+        )
+        email = _make_email(subject="Urgent: please update bank details")
+        result = self.analyzer.analyze(email)
+        assert result.get("intent_source") == "nlp"
+        assert result.get("category_shift") is True
+
     @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
     @patch.object(BECAnalyzer, "_get_pair", return_value=None)
     @patch.object(BECAnalyzer, "_get_profile")
@@ -349,12 +414,8 @@ class TestBECAnalyzer:
     @patch("analysis.analyzers.bec.analyzer._get_nlp_classifier")
     def test_first_contact_sensitive_request(self, mock_nlp_fn, mock_profile, mock_pair, mock_dpair):
         """First contact + urgent intent → low_volume_sensitive_request."""
-        mock_classifier = MagicMock()
-        mock_classifier.return_value = {
-            "labels": [NLP_CANDIDATE_LABELS[0]],  # urgent_action
-            "scores": [0.88],
-        }
-        mock_nlp_fn.return_value = mock_classifier
+        # NLP returns "urgent_action"
+        mock_nlp_fn.return_value = _fake_classifier(NLP_CANDIDATE_LABELS[0], 0.88)
         mock_pair.return_value = None  # first contact
 
         email = _make_email(subject="URGENT: wire transfer needed now")
@@ -397,14 +458,14 @@ class TestBECAnalyzer:
         "analysis.analyzers.bec.analyzer._get_nlp_classifier",
         return_value=None,
     )
-    def test_emits_all_21_observations(self, mock_nlp, mock_profile, mock_pair, mock_dpair):
-        """Verify the analyzer always emits exactly 21 observations."""
+    def test_emits_all_22_observations(self, mock_nlp, mock_profile, mock_pair, mock_dpair):
+        """Verify the analyzer always emits exactly 22 observations."""
         email = _make_email()
         result = self.analyzer.analyze(email)
         keys = {o.key for o in result.observations}
         expected = {
             "bec_risk_score", "bec_risk_level", "intent_category",
-            "intent_confidence", "sender_tenure_days", "is_new_sender",
+            "intent_confidence", "intent_source", "sender_tenure_days", "is_new_sender",
             "display_name_anomaly", "category_shift", "time_anomaly",
             "reply_to_mismatch", "is_first_contact",
             "low_volume_sensitive_request", "context_escalation",
@@ -415,7 +476,7 @@ class TestBECAnalyzer:
             "topics_detected", "content_has_personal_info",
         }
         assert keys == expected
-        assert len(result.observations) == 21
+        assert len(result.observations) == 22
 
     @patch.object(BECAnalyzer, "_get_domain_pair", return_value=None)
     @patch.object(BECAnalyzer, "_get_pair", return_value=None)
@@ -431,13 +492,47 @@ class TestBECAnalyzer:
         d = result.to_dict()
         assert d["analyzer"] == "bec_detector"
         assert isinstance(d["observations"], list)
-        assert len(d["observations"]) == 21
+        assert len(d["observations"]) == 22
         # Verify round-trip
         for obs_dict in d["observations"]:
             obs = Observation.from_dict(obs_dict)
             assert obs.key in {o.key for o in result.observations}
 
 
+# ---------------------------------------------------------------------------
+# Profile update tests (DB writes mocked)
+# ---------------------------------------------------------------------------
+
+class TestUpdateBehavioralProfiles:
+
+    def setup_method(self):
+        pytest.importorskip("ices_shared.db")  # needs psycopg
+
+    def _update(self, intent_source: str):
+        verdict = Verdict(results=[AnalysisResult(analyzer="bec_detector", observations=[
+            Observation(key="intent_category", value="informational"),
+            Observation(key="intent_source", value=intent_source),
+        ])])
+        with patch("analysis.analyzers.bec.db.init_bec_schema"), \
+                patch("ices_shared.db.get_connection") as mock_conn, \
+                patch("analysis.analyzers.bec.db.upsert_sender_profile") as mock_profile, \
+                patch("analysis.analyzers.bec.db.upsert_sender_recipient_pair") as mock_pair:
+            mock_conn.return_value.__enter__.return_value = MagicMock()
+            update_behavioral_profiles(_make_email(), verdict)
+        return mock_profile.call_args.kwargs, mock_pair.call_args.kwargs
+
+    def test_classified_intent_is_counted(self):
+        profile_kwargs, pair_kwargs = self._update("nlp")
+        assert profile_kwargs["category"] == "informational"
+        assert pair_kwargs["category"] == "informational"
+
+    def test_skipped_intent_is_counted_as_informational(self):
+        """Gated routine mail still counts, so high-risk ratios keep their denominator."""
+        profile_kwargs, pair_kwargs = self._update("skipped")
+        assert profile_kwargs["category"] == "informational"
+        assert pair_kwargs["category"] == "informational"
+
+
 # ---------------------------------------------------------------------------
 # Content signal tests
 # ---------------------------------------------------------------------------
@@ -456,6 +551,18 @@ class TestContentSignals:
         assert any("account:334070299722" in e for e in cs.financial_entities)
         assert any("bank:" in e for e in cs.financial_entities)
 
+    def test_financial_entities_non_ascii_text(self):
+        text = "Überweisung — ROUTING: 061000052, ACCT 334070299722"
+        cs = _scan_content_signals(text)
+        assert cs.financial_entities == [
+            "routing:061000052", "account:334070299722",
+        ]
+
+    def test_no_financial_entities(self):
+        cs = _scan_content_signals("Lunch on Thursday? The slides are on the drive.")
+        assert cs.has_financial_entities is False
+        assert cs.financial_entities == []
+
     def test_urgency_keywords(self):
         text = "This is very urgent! Please act immediately, ASAP."
         cs = _scan_content_signals(text)
@@ -518,3 +625,44 @@ class TestContentSignals:
         assert cs.has_urgency_language is False
         assert cs.has_credential_request is False
         assert cs.has_personal_info_request is False
+
+
+# ---------------------------------------------------------------------------
+# Profile lookup cache tests
+# ---------------------------------------------------------------------------
+
+class TestTTLCache:
+
+    def setup_method(self):
+        self.now = 1000.0
+        self.cache = TTLCache(maxsize=2, ttl=60, clock=lambda: self.now)
+
+    def test_hit_and_miss(self):
+        self.cache.set("a", 1)
+        assert self.cache.get("a") == 1
+        assert self.cache.get("b", "missing") == "missing"
+
+    def test_cached_none_is_a_hit(self):
+        self.cache.set("a", None)
+        assert self.cache.get("a", "missing") is None
+
+    def test_entries_expire(self):
+        self.cache.set("a", 1)
+        self.now += 61
+        assert self.cache.get("a") is None
+        assert len(self.cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")          # "b" is now the oldest
+        self.cache.set("c", 3)
+        assert self.cache.get("b") is None
+        assert self.cache.get("a") == 1
+        assert self.cache.get("c") == 3
+
+    def test_discard(self):
+        self.cache.set("a", 1)
+        self.cache.discard("a")
+        self.cache.discard("never-set")
+        assert self.cache.get("a") is None
@@ -13,27 +13,46 @@
 # limitations under the License.
 
 """Tests for the analysis pipeline — observation model."""
+import threading
+import time
+from types import MappingProxyType
+from unittest.mock import patch
+
 import pytest
-from analysis.models import EmailEvent, EmailBody, Attachment, AnalysisResult, Observation
+from analysis.analyzers._base import BaseAnalyzer
+from analysis.models import EmailEvent, EmailBody, Attachment, AnalysisResult, Observation, Verdict
 from analysis.pipeline import run_pipeline
 
 
+# Shared, never-mutated defaults: analyzers only read from the email, so one
+# body / headers / attachments instance can back every test case.
+_EMAIL_DEFAULTS = MappingProxyType({
+    "message_id": "test-msg-001",
+    "user_id": "user@example.com",
+    "tenant_id": "test-tenant",
+    "received_at": "2026-01-01T00:00:00Z",
+    "sender": "sender@example.com",
+    "sender_name": "Test Sender",
+    "subject": "Test email",
+    "body": EmailBody(content_type="text", content="Hello world"),
+    "headers": MappingProxyType({}),
+    "attachments": (),
+})
+
+
 def _make_email(**kwargs) -> EmailEvent:
     """Helper to create test emails with sensible defaults."""
-    defaults = {
-        "message_id": "test-msg-001",
-        "user_id": "user@example.com",
-        "tenant_id": "test-tenant",
-        "received_at": "2026-01-01T00:00:00Z",
-        "sender": "sender@example.com",
-        "sender_name": "Test Sender",
-        "subject": "Test email",
-        "body": EmailBody(content_type="text", content="Hello world"),
-        "headers": {},
-        "attachments": [],
-    }
-    defaults.update(kwargs)
-    return EmailEvent(**defaults)
+    return EmailEvent(**{**_EMAIL_DEFAULTS, **kwargs})
+
+
+# AnalysisResult is slotted, so check attributes on the instance, not vars().
+_RESULT_FIELDS = frozenset({"analyzer", "observations"})
+
+
+@pytest.fixture(scope="module")
+def default_verdict():
+    """One pipeline run over the default email, shared by read-only tests."""
+    return run_pipeline(_make_email())
 
 
 class TestPipeline:
@@ -121,30 +140,27 @@ class TestPipeline:
         assert saas_results[0].get("provider") == "Dropbox"
         assert saas_results[0].get("confidence") is not None
 
-    def test_each_result_has_observations(self):
+    def test_each_result_has_observations(self, default_verdict):
         """Each analyzer result should have an observations list."""
-        email = _make_email()
-        verdict = run_pipeline(email)
+        verdict = default_verdict
 
         for result in verdict.results:
-            assert hasattr(result, "analyzer")
-            assert hasattr(result, "observations")
+            missing = {n for n in _RESULT_FIELDS if not hasattr(result, n)}
+            assert not missing, missing
             assert isinstance(result.observations, list)
 
-    def test_verdict_has_required_fields(self):
+    def test_verdict_has_required_fields(self, default_verdict):
         """Verdict should always have message_id, user_id, tenant_id, sender."""
-        email = _make_email()
-        verdict = run_pipeline(email)
+        verdict = default_verdict
 
         assert verdict.message_id == "test-msg-001"
         assert verdict.user_id == "user@example.com"
         assert verdict.tenant_id == "test-tenant"
         assert verdict.sender == "sender@example.com"
 
-    def test_verdict_to_dict(self):
+    def test_verdict_to_dict(self, default_verdict):
         """Verdict.to_dict() should produce a JSON-safe dictionary."""
-        email = _make_email()
-        verdict = run_pipeline(email)
+        verdict = default_verdict
         d = verdict.to_dict()
 
         assert isinstance(d, dict)
@@ -158,6 +174,15 @@ class TestPipeline:
             assert "observations" in r
             assert isinstance(r["observations"], list)
 
+    def test_verdict_to_summary(self, default_verdict):
+        """Verdict.to_summary() lists the analyzers that ran, in order."""
+        verdict = default_verdict
+
+        assert verdict.to_summary() == {
+            "message_id": "test-msg-001",
+            "analyzers": [r.analyzer for r in verdict.results],
+        }
+
     def test_observation_round_trip(self):
         """Observation should serialize and deserialize correctly."""
         obs = Observation(key="spf", value="fail", type="pass_fail")
@@ -167,6 +192,27 @@ class TestPipeline:
         assert restored.value == "fail"
         assert restored.type == "pass_fail"
 
+    def test_observation_is_immutable(self):
+        """Observations are emitted once and never edited in place."""
+        obs = Observation(key="spf", value="pass", type="pass_fail")
+        with pytest.raises(AttributeError):
+            obs.value = "fail"
+        assert obs._replace(value="fail").value == "fail"
+        assert Observation(key="spf", value="pass") == Observation(key="spf", value="pass")
+
+    def test_result_models_have_no_instance_dict(self):
+        """Per-email result objects are slotted to keep them small."""
+        assert not hasattr(Observation(), "__dict__")
+        assert not hasattr(AnalysisResult(), "__dict__")
+        assert not hasattr(Verdict(), "__dict__")
+
+    def test_email_models_have_no_instance_dict(self):
+        """One EmailEvent (plus body/attachments) is built per message; keep them slotted."""
+        email = _make_email(attachments=[Attachment(name="a.pdf")])
+        assert not hasattr(email, "__dict__")
+        assert not hasattr(email.body, "__dict__")
+        assert not hasattr(email.attachments[0], "__dict__")
+
     def test_analysis_result_round_trip(self):
         """AnalysisResult should serialize and deserialize correctly."""
         result = AnalysisResult(
@@ -182,3 +228,49 @@ class TestPipeline:
         assert len(restored.observations) == 2
         assert restored.get("a") == 1
         assert restored.get("b") == "pass"
+
+
+class _SlowAnalyzer(BaseAnalyzer):
+    name = "slow"
+    order = 1
+    parallelizable = True
+
+    def analyze(self, email):
+        time.sleep(0.05)
+        return AnalysisResult(analyzer=self.name, observations=[
+            Observation(key="thread", value=threading.current_thread().name),
+        ])
+
+
+class _BrokenAnalyzer(BaseAnalyzer):
+    name = "broken"
+    order = 2
+    parallelizable = True
+
+    def analyze(self, email):
+        raise RuntimeError("boom")
+
+
+class _InlineAnalyzer(BaseAnalyzer):
+    name = "inline"
+    order = 3
+
+    def analyze(self, email):
+        return AnalysisResult(analyzer=self.name, observations=[
+            Observation(key="thread", value=threading.current_thread().name),
+        ])
+
+
+class TestParallelPipeline:
+    """Parallelizable analyzers run on the pool; results keep analyzer order."""
+
+    @patch("analysis.pipeline._get_analyzers")
+    def test_results_keep_order_and_threads(self, mock_analyzers):
+        mock_analyzers.return_value = [_SlowAnalyzer(), _BrokenAnalyzer(), _InlineAnalyzer()]
+        verdict = run_pipeline(_make_email())
+
+        assert [r.analyzer for r in verdict.results] == ["slow", "broken", "inline"]
+        assert verdict.results[0].get("thread").startswith("analyzer")
+        assert verdict.results[2].get("thread") == threading.current_thread().name
+        assert verdict.results[1].get("error") == "boom"
+        assert verdict.results[0].processing_time_ms >= 50
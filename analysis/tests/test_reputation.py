@@ -13,8 +13,9 @@
 # limitations under the License.
 
 """Tests for the Reputation analyzer."""
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import socket
+from types import MappingProxyType
 
 import pytest
 from analysis.models import EmailEvent, EmailBody, Observation
@@ -24,22 +25,46 @@ from analysis.analyzers.reputation.analyzer import (
     _check_ip,
     _check_domain,
     _dnsbl_lookup,
+    PROVIDERS,
 )
 
+_ZEN = next(p for p in PROVIDERS if p["id"] == "spamhaus_zen")
+_DBL = next(p for p in PROVIDERS if p["id"] == "spamhaus_dbl")
+
+
+# Shared, never-mutated defaults reused by every _make_email() call.
+_EMAIL_DEFAULTS = MappingProxyType({
+    "message_id": "test-001",
+    "user_id": "user@test.com",
+    "tenant_id": "tenant-001",
+    "sender": "sender@example.com",
+    "subject": "Test",
+    "body": EmailBody(content_type="text", content=""),
+    "headers": MappingProxyType({}),
+    "attachments": (),
+})
+
 
 def _make_email(**kwargs) -> EmailEvent:
-    defaults = {
-        "message_id": "test-001",
-        "user_id": "user@test.com",
-        "tenant_id": "tenant-001",
-        "sender": "sender@example.com",
-        "subject": "Test",
-        "body": EmailBody(content_type="text", content=""),
-        "headers": {},
-        "attachments": [],
-    }
-    defaults.update(kwargs)
-    return EmailEvent(**defaults)
+    return EmailEvent(**{**_EMAIL_DEFAULTS, **kwargs})
+
+
+class _FakeRedis:
+    """Minimal stand-in for the DNSBL cache client: get/setex over a dict."""
+
+    __slots__ = ("_store", "calls")
+
+    def __init__(self, store=None):
+        self._store = dict(store or {})
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(("get", key))
+        return self._store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.calls.append(("setex", key, ttl, value))
+        self._store[key] = value
 
 
 class TestExtractSenderIP:
@@ -55,6 +80,12 @@ class TestExtractSenderIP:
         headers = {"Received": "from internal (10.0.0.1) by mail (192.168.1.1)"}
         assert _extract_sender_ip(headers) is None
 
+    def test_long_received_chain(self):
+        """Private relay hops are skipped until the first public IP."""
+        hops = [f"from relay{i} (10.0.0.{i}) by mx{i}" for i in range(1, 20)]
+        hops.append("from origin (93.184.216.34) by relay1")
+        assert _extract_sender_ip({"Received": hops}) == "93.184.216.34"
+
 
 class TestDNSBLLookup:
     """Tests for raw DNSBL DNS queries and caching."""
@@ -71,9 +102,7 @@ class TestDNSBLLookup:
     @patch("analysis.analyzers.reputation.analyzer._get_redis_client")
     @patch("analysis.analyzers.reputation.analyzer.socket.gethostbyname")
     def test_lookup_cache_hit(self, mock_dns, mock_redis):
-        mock_r = MagicMock()
-        mock_r.get.return_value = "127.0.0.5"
-        mock_redis.return_value = mock_r
+        mock_redis.return_value = _FakeRedis({"cache_key": "127.0.0.5"})
 
         assert _dnsbl_lookup("query.example.com", "cache_key") == "127.0.0.5"
         mock_dns.assert_not_called()
@@ -81,49 +110,88 @@ class TestDNSBLLookup:
     @patch("analysis.analyzers.reputation.analyzer._get_redis_client")
     @patch("analysis.analyzers.reputation.analyzer.socket.gethostbyname")
     def test_lookup_cache_miss_and_store(self, mock_dns, mock_redis):
-        mock_r = MagicMock()
-        mock_r.get.return_value = None
-        mock_redis.return_value = mock_r
+        fake = mock_redis.return_value = _FakeRedis()
         mock_dns.return_value = "127.0.0.2"
 
         assert _dnsbl_lookup("query.example.com", "cache_key") == "127.0.0.2"
         mock_dns.assert_called_once()
-        mock_r.setex.assert_called_with("cache_key", 3600, "127.0.0.2")
+        assert fake.calls[-1] == ("setex", "cache_key", 3600, "127.0.0.2")
 
     @patch("analysis.analyzers.reputation.analyzer._get_redis_client")
     @patch("analysis.analyzers.reputation.analyzer.socket.gethostbyname")
     def test_lookup_nxdomain_caching(self, mock_dns, mock_redis):
-        mock_r = MagicMock()
-        mock_r.get.return_value = None
-        mock_redis.return_value = mock_r
+        fake = mock_redis.return_value = _FakeRedis()
         mock_dns.side_effect = socket.gaierror("NXDOMAIN")
 
         assert _dnsbl_lookup("query.example.com", "cache_key") is None
-        mock_r.setex.assert_called_with("cache_key", 3600, "NXDOMAIN")
+        assert fake.calls[-1] == ("setex", "cache_key", 3600, "NXDOMAIN")
 
     @patch("analysis.analyzers.reputation.analyzer._get_redis_client")
     def test_lookup_cached_nxdomain(self, mock_redis):
-        mock_r = MagicMock()
-        mock_r.get.return_value = "NXDOMAIN"
-        mock_redis.return_value = mock_r
+        mock_redis.return_value = _FakeRedis({"cache_key": "NXDOMAIN"})
 
         assert _dnsbl_lookup("query.example.com", "cache_key") is None
 
 
+class TestCheckIP:
+    """DNSBL return codes map to list labels; one parametrized case per code."""
+
+    @pytest.mark.parametrize("dns_reply,expected_listed,expected_label", [
+        ("127.0.0.2", True, "SBL"),
+        ("127.0.0.4", True, "XBL-CBL"),
+        ("127.0.0.10", True, "PBL"),
+        (None, False, ""),
+        ("127.0.0.99", True, "unknown(127.0.0.99)"),
+    ])
+    @patch("analysis.analyzers.reputation.analyzer._dnsbl_lookup")
+    def test_check_ip_codes(self, mock_lookup, dns_reply, expected_listed, expected_label):
+        mock_lookup.return_value = dns_reply
+
+        assert _check_ip("1.2.3.4", _ZEN) == (expected_listed, expected_label)
+        mock_lookup.assert_called_once_with(
+            "4.3.2.1.zen.spamhaus.org", "reputation:ip:spamhaus_zen:1.2.3.4",
+        )
+
+
+class TestCheckDomain:
+    """Domain blocklist codes map to DBL categories."""
+
+    @pytest.mark.parametrize("dns_reply,expected_listed,expected_label", [
+        ("127.0.1.2", True, "spam-domain"),
+        ("127.0.1.4", True, "phish-domain"),
+        (None, False, ""),
+    ])
+    @patch("analysis.analyzers.reputation.analyzer._dnsbl_lookup")
+    def test_check_domain_codes(self, mock_lookup, dns_reply, expected_listed, expected_label):
+        mock_lookup.return_value = dns_reply
+
+        assert _check_domain("bad.example", _DBL) == (expected_listed, expected_label)
+        mock_lookup.assert_called_once_with(
+            "bad.example.dbl.spamhaus.org", "reputation:domain:spamhaus_dbl:bad.example",
+        )
+
+
 class TestReputationAnalyzer:
     """Integration tests for the reputation analyzer."""
 
-    def setup_method(self):
-        self.analyzer = ReputationAnalyzer()
+    @classmethod
+    def setup_class(cls):
+        # analyze() keeps no per-email state, so one instance serves the class.
+        cls.analyzer = ReputationAnalyzer()
+
+    @pytest.fixture(autouse=True)
+    def _patched_checks(self):
+        with patch("analysis.analyzers.reputation.analyzer._check_ip") as ip, \
+             patch("analysis.analyzers.reputation.analyzer._check_domain") as domain:
+            self.mock_ip, self.mock_domain = ip, domain
+            yield
 
     def test_name(self):
         assert self.analyzer.name == "reputation"
 
-    @patch("analysis.analyzers.reputation.analyzer._check_domain")
-    @patch("analysis.analyzers.reputation.analyzer._check_ip")
-    def test_clean_email(self, mock_ip, mock_domain):
-        mock_ip.return_value = (False, "")
-        mock_domain.return_value = (False, "")
+    def test_clean_email(self):
+        self.mock_ip.return_value = (False, "")
+        self.mock_domain.return_value = (False, "")
 
         email = _make_email(
             sender="user@clean.example",
@@ -135,9 +203,7 @@ class TestReputationAnalyzer:
         assert result.get("ip_listed") is False
         assert result.get("domain_listed") is False
 
-    @patch("analysis.analyzers.reputation.analyzer._check_domain")
-    @patch("analysis.analyzers.reputation.analyzer._check_ip")
-    def test_listed_ip_multiple_providers(self, mock_ip, mock_domain):
+    def test_listed_ip_multiple_providers(self):
         # Mock responses based on provider arg
         def side_effect(ip, provider):
             if provider["id"] == "spamhaus_zen":
@@ -146,8 +212,8 @@ class TestReputationAnalyzer:
                 return (True, "Listed")
             return (False, "")
 
-        mock_ip.side_effect = side_effect
-        mock_domain.return_value = (False, "")
+        self.mock_ip.side_effect = side_effect
+        self.mock_domain.return_value = (False, "")
 
         email = _make_email(
             sender="user@example.com",
@@ -168,11 +234,9 @@ class TestReputationAnalyzer:
         nix_listed = next((o for o in obs if o["key"] == "nix_spam_listed"), None)
         assert nix_listed is None  # Not listed
 
-    @patch("analysis.analyzers.reputation.analyzer._check_domain")
-    @patch("analysis.analyzers.reputation.analyzer._check_ip")
-    def test_listed_domain(self, mock_ip, mock_domain):
-        mock_ip.return_value = (False, "")
-        mock_domain.return_value = (True, "spam-domain")
+    def test_listed_domain(self):
+        self.mock_ip.return_value = (False, "")
+        self.mock_domain.return_value = (True, "spam-domain")
 
         email = _make_email(
             sender="spammer@bad-domain.com",
@@ -186,11 +250,9 @@ class TestReputationAnalyzer:
         dbl_listed = next((o for o in obs if o["key"] == "spamhaus_dbl_listed"), None)
         assert dbl_listed and dbl_listed["value"] is True
 
-    @patch("analysis.analyzers.reputation.analyzer._check_domain")
-    @patch("analysis.analyzers.reputation.analyzer._check_ip")
-    def test_error_handling(self, mock_ip, mock_domain):
-        mock_ip.side_effect = Exception("DNS timeout")
-        mock_domain.return_value = (False, "")
+    def test_error_handling(self):
+        self.mock_ip.side_effect = Exception("DNS timeout")
+        self.mock_domain.return_value = (False, "")
 
         email = _make_email(
             sender="user@example.com",
@@ -25,6 +25,18 @@ from pathlib import Path
 import pytest
 from analysis.models import EmailEvent
 
+# The schema lives in shared/ at the repo root (or /app/shared in the
+# container image); resolve and parse it once for the whole module.
+_SCHEMA_PATH = next(
+    (
+        base / "shared" / "schemas" / "email_event.json"
+        for base in Path(__file__).resolve().parents
+        if (base / "shared" / "schemas" / "email_event.json").exists()
+    ),
+    None,
+)
+_SCHEMA = json.loads(_SCHEMA_PATH.read_text()) if _SCHEMA_PATH else None
+
 
 class TestGoIngestionFormat:
     """Test that Go-style payloads (flat sender) parse correctly."""
@@ -99,12 +111,9 @@ class TestSharedSchema:
 
     def test_schema_loads(self):
         """The shared JSON schema should be valid JSON."""
-        schema_path = Path(__file__).parent.parent.parent.parent / "shared" / "schemas" / "email_event.json"
-        if not schema_path.exists():
-            pytest.skip(f"Schema file not found: {schema_path}")
-
-        with open(schema_path) as f:
-            schema = json.load(f)
+        if _SCHEMA is None:
+            pytest.skip("Schema file not found: shared/schemas/email_event.json")
+        schema = _SCHEMA
 
         assert schema["title"] == "EmailEvent"
         assert "message_id" in schema["required"]
@@ -113,12 +122,9 @@ class TestSharedSchema:
 
     def test_schema_required_fields_match_from_dict(self):
         """All required fields in the schema should be handled by from_dict()."""
-        schema_path = Path(__file__).parent.parent.parent.parent / "shared" / "schemas" / "email_event.json"
-        if not schema_path.exists():
-            pytest.skip(f"Schema file not found: {schema_path}")
-
-        with open(schema_path) as f:
-            schema = json.load(f)
+        if _SCHEMA is None:
+            pytest.skip("Schema file not found: shared/schemas/email_event.json")
+        schema = _SCHEMA
 
         # Build a minimal valid payload
         payload = {
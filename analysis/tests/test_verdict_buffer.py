@@ -0,0 +1,193 @@
+# Copyright (c) 2026 John Earle
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the buffered verdict publisher."""
+
+import base64
+import time
+from unittest.mock import MagicMock, patch
+
+import msgpack
+import orjson
+import pytest
+from celery import Celery
+from celery.worker.request import Request
+from kombu import Connection
+from kombu.serialization import prepare_accept_content
+from kombu.transport import redis as kombu_redis
+
+from ices_shared.celery_defaults import CELERY_DEFAULTS
+from analysis.verdict_buffer import VerdictBuffer, _build_message
+
+
+class TestVerdictBuffer:
+    """Test the buffering and flush mechanics."""
+
+    def setup_method(self):
+        self.pipe = MagicMock()
+        client = MagicMock()
+        client.pipeline.return_value = self.pipe
+        self.patcher = patch("analysis.verdict_buffer._get_redis", return_value=client)
+        self.get_redis = self.patcher.start()
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def _pushed(self):
+        """Verdict dicts passed to LPUSH, in push order."""
+        verdicts = []
+        for call in self.pipe.lpush.call_args_list:
+            for raw in call.args[1:]:
+                body = base64.b64decode(orjson.loads(raw)["body"])
+                verdicts.extend(msgpack.unpackb(body)[0])
+        return verdicts
+
+    def test_add_below_threshold_does_not_publish(self):
+        buffer = VerdictBuffer(flush_size=3, flush_interval_ms=60_000)
+        buffer.add({"message_id": "m1"})
+
+        self.pipe.execute.assert_not_called()
+        assert len(buffer) == 1
+        buffer.flush()
+
+    def test_flushes_when_full(self):
+        buffer = VerdictBuffer(flush_size=2, flush_interval_ms=60_000)
+        buffer.add({"message_id": "m1"})
+        buffer.add({"message_id": "m2"})
+
+        self.pipe.lpush.assert_called_once()
+        self.pipe.execute.assert_called_once()
+        assert self.pipe.lpush.call_args.args[0] == "verdicts"
+        assert self._pushed() == [{"message_id": "m1"}, {"message_id": "m2"}]
+        assert len(buffer) == 0
+
+    def test_timer_flushes_partial_batch(self):
+        buffer = VerdictBuffer(flush_size=100, flush_interval_ms=1)
+        buffer.add({"message_id": "m1"})
+        deadline = time.monotonic() + 2
+        while not self.pipe.execute.called and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        self.pipe.execute.assert_called_once()
+        assert len(buffer) == 0
+
+    def test_failed_flush_keeps_verdicts(self):
+        self.pipe.execute.side_effect = ConnectionError("broker down")
+        buffer = VerdictBuffer(flush_size=100, flush_interval_ms=60_000)
+        for i in range(3):
+            buffer.add({"message_id": f"m{i}"})
+
+        assert buffer.flush() == 0
+        assert list(buffer._pending) == [
+            {"message_id": "m0"}, {"message_id": "m1"}, {"message_id": "m2"},
+        ]
+        buffer._timer.cancel()
+
+    def test_failed_flush_is_retried_without_new_add(self):
+        self.pipe.execute.side_effect = [ConnectionError("broker down"), None]
+        buffer = VerdictBuffer(flush_size=100, flush_interval_ms=1, retry_max_ms=10)
+        buffer.add({"message_id": "m1"})
+        deadline = time.monotonic() + 2
+        while self.pipe.execute.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        assert self.pipe.execute.call_count == 2
+        assert len(buffer) == 0
+
+    def test_add_raises_while_broker_is_failing(self):
+        """Once a flush has failed, add() publishes synchronously and raises."""
+        self.pipe.execute.side_effect = ConnectionError("broker down")
+        buffer = VerdictBuffer(flush_size=100, flush_interval_ms=60_000)
+        buffer.add({"message_id": "m0"})
+        buffer.flush()
+
+        with pytest.raises(ConnectionError):
+            buffer.add({"message_id": "m1"})
+        # The failed task's verdict is withdrawn (it will be redelivered);
+        # the already-acked one is kept, never dropped.
+        assert list(buffer._pending) == [{"message_id": "m0"}]
+        buffer._timer.cancel()
+
+        self.pipe.execute.side_effect = None
+        buffer.add({"message_id": "m2"})
+        assert self._pushed()[-2:] == [{"message_id": "m0"}, {"message_id": "m2"}]
+        assert len(buffer) == 0
+
+    def test_add_over_max_pending_publishes_synchronously(self):
+        self.pipe.execute.side_effect = [None, ConnectionError("broker down")]
+        buffer = VerdictBuffer(flush_size=100, flush_interval_ms=60_000, max_pending=1)
+        buffer.add({"message_id": "m0"})
+        buffer.add({"message_id": "m1"})
+
+        assert self._pushed() == [{"message_id": "m0"}, {"message_id": "m1"}]
+        assert len(buffer) == 0
+
+        buffer.add({"message_id": "m2"})
+        with pytest.raises(ConnectionError):
+            buffer.add({"message_id": "m3"})
+        assert list(buffer._pending) == [{"message_id": "m2"}]
+        buffer._timer.cancel()
+
+    def test_flush_empty_is_noop(self):
+        assert VerdictBuffer().flush() == 0
+        self.get_redis.assert_not_called()
+
+
+class TestBuildMessage:
+    """The hand-built envelope must look like a Celery task to the worker."""
+
+    def test_celery_envelope(self):
+        message = orjson.loads(_build_message({"message_id": "m1"}))
+
+        assert message["content-type"] == "application/x-msgpack"
+        assert message["properties"]["body_encoding"] == "base64"
+        assert message["properties"]["delivery_info"]["routing_key"] == "verdicts"
+        headers = message["headers"]
+        assert headers["task"] == "verdict.tasks.execute_verdict"
+        assert headers["id"] == message["properties"]["correlation_id"]
+
+        args, kwargs, embed = msgpack.unpackb(base64.b64decode(message["body"]))
+        assert args == [{"message_id": "m1"}]
+        assert kwargs == {}
+        assert embed["callbacks"] is None
+
+    def test_kombu_and_celery_decode(self):
+        """The envelope survives kombu's Redis decode and Celery's protocol-2 parsing."""
+        app = Celery("verdict-test", set_as_current=False)
+        app.conf.update(CELERY_DEFAULTS, result_backend=None)
+        received = []
+
+        @app.task(name="verdict.tasks.execute_verdict", shared=False)
+        def execute_verdict(verdict):
+            received.append(verdict)
+
+        # A mocked client stands in for the broker; only the decode path runs.
+        with patch.object(kombu_redis.Channel, "client", MagicMock()), \
+                Connection(app.conf.broker_url) as conn:
+            channel = conn.default_channel
+            message = channel.Message(
+                orjson.loads(_build_message({"message_id": "m1"})),
+                channel=channel,
+                accept=prepare_accept_content(app.conf.accept_content),
+            )
+            request = Request(message, app=app, task=execute_verdict)
+
+            assert request.name == "verdict.tasks.execute_verdict"
+            assert request.id == message.headers["id"]
+            assert request.args == [{"message_id": "m1"}]
+            assert request.kwargs == {}
+            assert request.delivery_info["routing_key"] == "verdicts"
+
+            request.execute()
+            assert received == [{"message_id": "m1"}]
@@ -65,19 +65,14 @@ type celeryMessage struct {
 // PublishEmailEvent serialises an email event and publishes it as a Celery task
 // to Redis. The Python analysis worker picks it up via `celery worker -Q emails`.
 func (p *Publisher) PublishEmailEvent(ctx context.Context, event *models.EmailEvent) error {
-	// Serialise the email event to JSON
-	eventJSON, err := json.Marshal(event)
-	if err != nil {
-		return fmt.Errorf("marshal email event: %w", err)
-	}
-
 	taskID := uuid.New().String()
 
-	// Build Celery task body
+	// Build Celery task body. The event is embedded as a JSON object (not a
+	// JSON string) so the worker decodes it once, with the task body.
 	task := celeryTask{
 		ID:     taskID,
 		Task:   "analysis.tasks.analyze_email",
-		Args:   []interface{}{string(eventJSON)},
+		Args:   []interface{}{event},
 		Kwargs: map[string]interface{}{},
 	}
 
@@ -0,0 +1,53 @@
+# Copyright (c) 2026 John Earle
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""On-disk Graph token cache shared by the scripts in this directory.
+
+Graph tokens live ~1h; keep them across runs so repeated invocations skip
+the login round trip. Keyed by tenant+client, written owner-only (0600).
+"""
+import json
+import os
+import time
+
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bc_graph_token.json")
+
+
+def _read_token_cache() -> dict:
+    try:
+        with open(TOKEN_CACHE_PATH) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_token(cache_key: str):
+    """Return a cached token with more than a minute left, else None."""
+    cached = _read_token_cache().get(cache_key) or {}
+    if time.time() < cached.get("exp", 0) - 60:
+        return cached.get("token")
+    return None
+
+
+def store_token(cache_key: str, token: str, expires_in: int) -> None:
+    """Best-effort write of the token cache; failures only cost a re-login."""
+    data = _read_token_cache()
+    data[cache_key] = {"token": token, "exp": time.time() + expires_in}
+    try:
+        os.makedirs(os.path.dirname(TOKEN_CACHE_PATH), exist_ok=True)
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+    except OSError:
+        pass
@@ -14,7 +14,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Compile resmoio/app-catalog YAML files into:
-  1. JSONL for HuggingFace upload (preserves nested objects)
+  1. JSONL for HuggingFace upload (preserves nested objects), plus a typed
+     Parquet copy of the same rows when pyarrow is installed
   2. JSON for runtime domain lookup (optimized for O(1) email sender matching)
 
 Drops: security, compliance (per user preference)
@@ -31,138 +32,37 @@ Usage:
 import json
 import os
 import sys
+from multiprocessing import Pool
 
+import orjson
+import yaml
 
-def parse_yaml_file(filepath):
-    """Parse resmo YAML files without pyyaml dependency.
-    
-    Handles:
-      - top-level scalars (key: value)
-      - top-level lists (key:\n  - item)
-      - one-level nested dicts (key:\n  subkey: value)
-      - deeper nesting for appRelations (key:\n  subkey:\n    subsubkey:\n    - item)
-    """
-    result = {}
-    current_key = None
-    current_list = None
-    current_dict = None
-    current_sub_key = None
-    current_sub_list = None
-    prev_indent = 0
-
-    with open(filepath) as f:
-        lines = f.readlines()
-
-    i = 0
-    while i < len(lines):
-        line = lines[i].rstrip('\n')
-        i += 1
-
-        if not line or line.lstrip().startswith('#'):
-            continue
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
-        indent = len(line) - len(line.lstrip())
-        content = line.lstrip()
-
-        # Flush deeper nested sub-list
-        if indent <= 2 and current_sub_key and current_sub_list is not None:
-            if current_dict is not None:
-                current_dict[current_sub_key] = current_sub_list
-            current_sub_key = None
-            current_sub_list = None
-
-        # Top-level key
-        if indent == 0 and ':' in content:
-            # Flush previous state
-            if current_key and current_list is not None:
-                result[current_key] = current_list
-                current_list = None
-            if current_key and current_dict is not None:
-                result[current_key] = current_dict
-                current_dict = None
-
-            parts = content.split(':', 1)
-            key = parts[0].strip()
-            val = parts[1].strip() if len(parts) > 1 else ''
-
-            current_key = key
-
-            if val == '[]':
-                result[key] = []
-                current_key = None
-            elif val == '':
-                pass  # list or dict follows
-            elif val in ('true', 'false'):
-                result[key] = val == 'true'
-                current_key = None
-            elif val.isdigit():
-                result[key] = int(val)
-                current_key = None
-            else:
-                # Handle multi-line descriptions (lines starting with spaces that are continuations)
-                full_val = val
-                while i < len(lines):
-                    next_line = lines[i].rstrip('\n')
-                    next_indent = len(next_line) - len(next_line.lstrip())
-                    next_content = next_line.lstrip()
-                    if next_indent >= 2 and not next_content.startswith('-') and ':' not in next_content:
-                        full_val += ' ' + next_content
-                        i += 1
-                    else:
-                        break
-                result[key] = full_val
-                current_key = None
-            continue
+# libyaml's C loader when available; the pure-Python SafeLoader otherwise
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
-        # List item at indent 0–2
-        if content.startswith('- ') and current_key and indent <= 2:
-            if current_sub_key is None:
-                if current_list is None:
-                    current_list = []
-                current_list.append(content[2:].strip())
-            else:
-                if current_sub_list is None:
-                    current_sub_list = []
-                current_sub_list.append(content[2:].strip())
-            continue
 
-        # Nested key: value
-        if indent > 0 and ':' in content and not content.startswith('-'):
-            parts = content.split(':', 1)
-            nkey = parts[0].strip()
-            nval = parts[1].strip() if len(parts) > 1 else ''
-
-            if indent == 2:
-                if current_key and current_dict is None:
-                    current_dict = {}
-                if current_dict is not None:
-                    if nval == '':
-                        # Could be a sub-dict or sub-list
-                        current_sub_key = nkey
-                        current_sub_list = None
-                    elif nval in ('true', 'false'):
-                        current_dict[nkey] = nval == 'true'
-                    elif nval.isdigit():
-                        current_dict[nkey] = int(nval)
-                    else:
-                        current_dict[nkey] = nval
-            elif indent >= 4 and current_sub_key:
-                # Deep nesting — store as sub-dict
-                if current_sub_list is None:
-                    current_sub_list = {}
-                if isinstance(current_sub_list, dict):
-                    current_sub_list[nkey] = nval
-            continue
+def parse_yaml_file(filepath):
+    """Parse one resmo app YAML file into a dict ({} if it isn't a mapping)."""
+    with open(filepath, 'rb') as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    return data if isinstance(data, dict) else {}
 
-    # Flush last
-    if current_sub_key and current_sub_list is not None and current_dict is not None:
-        current_dict[current_sub_key] = current_sub_list
-    if current_key and current_list is not None:
-        result[current_key] = current_list
-    if current_key and current_dict is not None:
-        result[current_key] = current_dict
 
-    return result
+def _parse_app(filepath):
+    """Pool worker: (app, None) on success, (None, error) on a bad file."""
+    try:
+        return parse_yaml_file(filepath), None
+    except Exception as e:
+        return None, e
 
 
 def build_hf_entry(app):
@@ -204,6 +104,34 @@ def build_hf_entry(app):
     return entry
 
 
+def _hf_schema():
+    """Arrow schema for build_hf_entry() rows; company.founded is nullable int32."""
+    strings = pa.list_(pa.string())
+    return pa.schema([
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("description", pa.string()),
+        ("category", pa.string()),
+        ("labels", strings),
+        ("company", pa.struct([
+            ("organization", pa.string()),
+            ("headquarters", pa.string()),
+            ("founded", pa.int32()),
+            ("homepage", pa.string()),
+        ])),
+        ("app_domains", strings),
+        ("related_domains", strings),
+        ("registration_emails", strings),
+        ("oauth_display_names", strings),
+    ])
+
+
+def write_hf_parquet(entries, path):
+    """Write HF entries as a Snappy-compressed Parquet table."""
+    table = pa.Table.from_pylist(entries, schema=_hf_schema())
+    pq.write_table(table, path, compression='snappy')
+
+
 def build_runtime_entry(app):
     """Build a runtime lookup entry optimized for the email analyzer."""
     entry = {
@@ -248,31 +176,42 @@ def main():
 
     os.makedirs(data_dir, exist_ok=True)
 
-    # Parse all YAML files
+    # Parse all YAML files across cores. imap keeps the sorted file order so
+    # the domain index (first app to claim a domain wins) stays deterministic.
+    with os.scandir(apps_dir) as it:
+        paths = sorted(e.path for e in it if e.name.endswith('.yml') and e.is_file())
     raw_apps = []
     errors = 0
-    for fname in sorted(os.listdir(apps_dir)):
-        if not fname.endswith('.yml'):
-            continue
-        try:
-            app = parse_yaml_file(os.path.join(apps_dir, fname))
-            if app and 'id' in app:
+    with Pool() as pool:
+        for app, err in pool.imap(_parse_app, paths, chunksize=32):
+            if err is not None:
+                errors += 1
+            elif app and 'id' in app:
                 raw_apps.append(app)
-        except Exception as e:
-            errors += 1
 
     print(f"Parsed {len(raw_apps)} apps ({errors} errors)")
 
     # --- Output 1: JSONL for HuggingFace ---
     hf_path = os.path.join(data_dir, 'saas_vendors_hf.jsonl')
-    with open(hf_path, 'w') as f:
-        for app in raw_apps:
-            entry = build_hf_entry(app)
-            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    hf_entries = [build_hf_entry(app) for app in raw_apps]
+    # 1 MB write buffer; each line is two writes into it, no concatenation
+    with open(hf_path, 'wb', buffering=1 << 20) as f:
+        newline = b'\n'
+        for entry in hf_entries:
+            f.write(orjson.dumps(entry))
+            f.write(newline)
 
     hf_size = os.path.getsize(hf_path)
     print(f"HuggingFace JSONL: {hf_size:,} bytes ({hf_size/1024:.0f} KB)")
 
+    if pa is not None:
+        parquet_path = os.path.join(data_dir, 'saas_vendors_hf.parquet')
+        write_hf_parquet(hf_entries, parquet_path)
+        pq_size = os.path.getsize(parquet_path)
+        print(f"HuggingFace Parquet: {pq_size:,} bytes ({pq_size/1024:.0f} KB)")
+    else:
+        print("HuggingFace Parquet: skipped (pyarrow not installed)")
+
     # --- Output 2: JSON for runtime lookup ---
     domain_index = {}
     apps_dict = {}
@@ -302,13 +241,14 @@ def main():
             "app_count": len(apps_dict),
             "domain_count": len(domain_index),
         },
-        "domain_index": dict(sorted(domain_index.items())),
-        "apps": dict(sorted(apps_dict.items())),
+        # Key order comes from OPT_SORT_KEYS at write time
+        "domain_index": domain_index,
+        "apps": apps_dict,
     }
 
     runtime_path = os.path.join(data_dir, 'saas_vendors.json')
-    with open(runtime_path, 'w') as f:
-        json.dump(runtime_output, f, indent=2)
+    with open(runtime_path, 'wb') as f:
+        f.write(orjson.dumps(runtime_output, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 
     runtime_size = os.path.getsize(runtime_path)
     print(f"Runtime JSON:      {runtime_size:,} bytes ({runtime_size/1024:.0f} KB)")
@@ -325,7 +265,7 @@ def main():
         print(f"  {c:35s} {n:4d}")
 
     # Show sample HF entry
-    sample = build_hf_entry(raw_apps[0])
+    sample = hf_entries[0]
     print(f"\nSample HF entry ({sample['id']}):")
     print(json.dumps(sample, indent=2, ensure_ascii=False))
 
@@ -19,25 +19,42 @@ the analysis pipeline via Redis/Celery.
 
 Usage: python3 scripts/test_e2e.py
 """
-import json
 import os
 import sys
 import uuid
 
+import orjson
 import redis
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from _graph_token import cached_token, store_token
+
+# Shared keep-alive session: the token and message calls reuse one connection.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
 
 def get_graph_token(tenant_id, client_id, client_secret):
     """Get an OAuth2 token for Graph API."""
+    cache_key = f"{tenant_id}:{client_id}"
+    token = cached_token(cache_key)
+    if token:
+        return token
+
     url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
-    resp = requests.post(url, data={
+    resp = SESSION.post(url, data={
         "client_id": client_id,
         "client_secret": client_secret,
         "scope": "https://graph.microsoft.com/.default",
         "grant_type": "client_credentials",
-    })
+    }, timeout=30)
     resp.raise_for_status()
-    return resp.json()["access_token"]
+    result = resp.json()
+    store_token(cache_key, result["access_token"], int(result.get("expires_in", 0)))
+    return result["access_token"]
 
 def fetch_latest_email(token, user_email):
     """Fetch the most recent email with headers."""
@@ -49,7 +66,7 @@ def fetch_latest_email(token, user_email):
         "Authorization": f"Bearer {token}",
         "Prefer": 'outlook.body-content-type="text"',
     }
-    resp = requests.get(url, headers=headers)
+    resp = SESSION.get(url, headers=headers, timeout=30)
     resp.raise_for_status()
     messages = resp.json().get("value", [])
     if not messages:
@@ -77,26 +94,26 @@ def graph_to_email_event(msg, user_email, tenant_id):
         "attachments": [],
     }
 
-def publish_celery_task(rdb, queue_name, email_event):
-    """Push an email event as a Celery-compatible task to Redis."""
-    task_id = str(uuid.uuid4())
+TASK_NAME = "analysis.tasks.analyze_email"
 
-    task_body = json.dumps({
+def build_celery_message(task_id, email_event):
+    """Serialize one analyze_email task in the envelope the Go publisher uses."""
+    task_body = orjson.dumps({
         "id": task_id,
-        "task": "analysis.tasks.analyze_email",
-        "args": [json.dumps(email_event)],
+        "task": TASK_NAME,
+        "args": [email_event],
         "kwargs": {},
         "retries": 0,
         "eta": None,
     })
 
-    msg = json.dumps({
-        "body": task_body,
+    return orjson.dumps({
+        "body": task_body.decode(),
         "content-encoding": "utf-8",
         "content-type": "application/json",
         "headers": {
             "lang": "py",
-            "task": "analysis.tasks.analyze_email",
+            "task": TASK_NAME,
             "id": task_id,
             "retries": 0,
         },
@@ -104,12 +121,31 @@ def publish_celery_task(rdb, queue_name, email_event):
             "correlation_id": task_id,
             "delivery_mode": 2,
             "delivery_tag": task_id,
-            "body_encoding": "base64",
+            "body_encoding": "utf-8",
         },
     })
 
-    rdb.lpush(queue_name, msg)
-    return task_id
+PUBLISH_FLUSH_EVERY = 500  # LPUSHes buffered per pipeline round trip
+
+def publish_celery_tasks(rdb, queue_name, email_events):
+    """Push email events as Celery-compatible tasks, pipelined in batches.
+
+    Returns the task ids in input order.
+    """
+    task_ids = []
+    pipe = rdb.pipeline(transaction=False)
+    for event in email_events:
+        task_id = str(uuid.uuid4())
+        pipe.lpush(queue_name, build_celery_message(task_id, event))
+        task_ids.append(task_id)
+        if len(pipe) >= PUBLISH_FLUSH_EVERY:
+            pipe.execute()
+    pipe.execute()
+    return task_ids
+
+def publish_celery_task(rdb, queue_name, email_event):
+    """Push a single email event as a Celery-compatible task to Redis."""
+    return publish_celery_tasks(rdb, queue_name, [email_event])[0]
 
 def main():
     # Load env
@@ -29,10 +29,11 @@ CELERY_DEFAULTS = {
     "broker_url": REDIS_URL,
     "result_backend": REDIS_URL,
 
-    # Serialization — JSON only, no pickle
+    # Serialization — JSON by default; msgpack is also accepted for the
+    # Python-to-Python verdict hop. Never pickle.
     "task_serializer": "json",
     "result_serializer": "json",
-    "accept_content": ["json"],
+    "accept_content": ["json", "msgpack"],
 
     # Reliability
     "task_acks_late": True,
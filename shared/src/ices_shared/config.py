@@ -25,6 +25,12 @@ from functools import lru_cache
 
 import yaml
 
+# libyaml's C parser when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 logger = logging.getLogger(__name__)
 
 # Search paths for config.yaml (Docker mount, then relative to repo root)
@@ -49,7 +55,7 @@ def load_config() -> dict:
             continue
         try:
             with open(path) as f:
-                config = yaml.safe_load(f) or {}
+                config = yaml.load(f, Loader=_SafeLoader) or {}
             logger.info("Configuration loaded from %s", path)
             return config
         except FileNotFoundError:
@@ -20,16 +20,18 @@ and verdict services via the Redis message queue. Both services import from
 this single source of truth.
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, NamedTuple
 
 
-@dataclass
-class Observation:
+class Observation(NamedTuple):
     """A single fact discovered by an analyzer.
 
     Observations use a typed key-value pattern so the policy engine can
     match on them generically without knowing which analyzer produced them.
+    They are immutable once emitted — build a new one rather than editing
+    an existing observation.
 
     Attributes:
         key:   What was observed (e.g. "spf", "ip_urls_found").
@@ -47,14 +49,18 @@ class Observation:
 
     @classmethod
     def from_dict(cls, data: dict) -> "Observation":
+        # Keys and types come from a small fixed vocabulary but arrive as
+        # fresh strings from the decoder; interning them shares one copy
+        # across every observation and lets dict/equality checks in the
+        # policy engine short-circuit on identity.
         return cls(
-            key=data.get("key", ""),
+            key=sys.intern(data.get("key", "")),
             value=data.get("value", ""),
-            type=data.get("type", "text"),
+            type=sys.intern(data.get("type", "text")),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     """Output of a single analyzer run.
 
@@ -79,9 +85,14 @@ class AnalysisResult:
         return default
 
     def to_dict(self) -> dict:
+        # Observation.to_dict inlined — Observations are plain tuples, so
+        # unpacking them skips a method call per observation.
         return {
             "analyzer": self.analyzer,
-            "observations": [o.to_dict() for o in self.observations],
+            "observations": [
+                {"key": key, "value": value, "type": type_}
+                for key, value, type_ in self.observations
+            ],
             "processing_time_ms": self.processing_time_ms,
         }
 
@@ -101,21 +112,21 @@ class AnalysisResult:
 # Email component models
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class EmailAddress:
     """An email sender or recipient."""
     address: str = ""
     name: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailBody:
     """The content of an email."""
     content_type: str = "text"   # "text" or "html"
     content: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Attachment:
     """An email attachment."""
     name: str = ""
@@ -128,7 +139,7 @@ class Attachment:
 # Verdict — unified model used by both analysis and verdict services
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Verdict:
     """Collection of all analyzer results for one email.
 
@@ -159,6 +170,13 @@ class Verdict:
             "results": [r.to_dict() for r in self.results],
         }
 
+    def to_summary(self) -> dict:
+        """Minimal task-return shape: which analyzers ran for this message."""
+        return {
+            "message_id": self.message_id,
+            "analyzers": [r.analyzer for r in self.results],
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> "Verdict":
         return cls(
@@ -8,12 +8,106 @@ analyzedEmails/remediate API to soft-delete a specific email.
 """
 import json
 import sys
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
 
 import httpx
 
 from ices_shared.config import get_tenants
 from verdict.token_manager import TokenManager, TenantCredentials
 
+REMEDIATE_URL = "https://graph.microsoft.com/beta/security/collaboration/analyzedEmails/remediate"
+
+# analyzedEmails entries per remediate call; halved on 413
+REMEDIATE_BATCH_SIZE = 100
+
+# Same-size retries of a throttled (429) batch before giving up on it
+THROTTLE_RETRIES = 3
+
+# (networkMessageId, recipient) pairs to quarantine.
+# The "VIP Offer" spam email from the backfill.
+TARGETS = [
+    (
+        "AAMkAGY0NjBlYjU4LWU2OGEtNGIyNy05YjhmLTcwN2YwYjc0Y2NkMABGAAAAAAAFVLugc5SYQokwuMMXKzMVBwC46pWeTmPhRp-NaAClzBKuAAAAAAEMAAC46pWeTmPhRp-NaAClzBKuAAGzyd04AAA=",
+        "John.Earle@MainMethod.AI",
+    ),
+]
+
+
+def remediate(client: httpx.Client, token: str, analyzed_emails: list[dict]) -> httpx.Response:
+    """POST one Defender remediate request (softDelete) on a shared client."""
+    body = {
+        "displayName": "ICES Quarantine Test",
+        "description": "BlackChamber ICES - live quarantine test",
+        "severity": "high",
+        "action": "softDelete",
+        "remediateBy": "automation",
+        "analyzedEmails": analyzed_emails,
+    }
+    print(f"\nPOST {REMEDIATE_URL}")
+    print(f"Body: {json.dumps(body, indent=2)}")
+    print("\nSending...")
+    return client.post(
+        REMEDIATE_URL,
+        json=body,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def retry_after(resp: httpx.Response, default: float = 5.0) -> float:
+    """Seconds to wait per Retry-After, which may be delta-seconds or an HTTP date."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def remediate_batch(client: httpx.Client, token: str, emails: list[dict]) -> list[httpx.Response]:
+    """Remediate one batch, retrying throttling and splitting oversize payloads.
+
+    429 means we were throttled — wait out Retry-After and resend the same
+    batch, up to THROTTLE_RETRIES times. 413 means the payload was too
+    large — retry as two smaller requests.
+    """
+    resp = remediate(client, token, emails)
+    for _ in range(THROTTLE_RETRIES):
+        if resp.status_code != 429:
+            break
+        time.sleep(retry_after(resp))
+        resp = remediate(client, token, emails)
+    if resp.status_code != 413 or len(emails) == 1:
+        return [resp]
+    mid = len(emails) // 2
+    return (
+        remediate_batch(client, token, emails[:mid])
+        + remediate_batch(client, token, emails[mid:])
+    )
+
+
+def remediate_all(client: httpx.Client, token: str, targets) -> list[httpx.Response]:
+    """Remediate (message_id, recipient) pairs, REMEDIATE_BATCH_SIZE per call."""
+    responses = []
+    it = iter(targets)
+    while chunk := list(islice(it, REMEDIATE_BATCH_SIZE)):
+        emails = [
+            {"networkMessageId": mid, "recipientEmailAddress": rcpt}
+            for mid, rcpt in chunk
+        ]
+        responses.extend(remediate_batch(client, token, emails))
+    return responses
+
 
 def main():
     # --- Build TokenManager from config ---
@@ -41,59 +135,34 @@ def main():
     token = manager.get_token(tenant_id)
     print(f"Token acquired (length={len(token)})")
 
-    # --- Target message ---
-    # The "VIP Offer" spam email from the backfill
-    message_id = "AAMkAGY0NjBlYjU4LWU2OGEtNGIyNy05YjhmLTcwN2YwYjc0Y2NkMABGAAAAAAAFVLugc5SYQokwuMMXKzMVBwC46pWeTmPhRp-NaAClzBKuAAAAAAEMAAC46pWeTmPhRp-NaAClzBKuAAGzyd04AAA="
-    recipient = "John.Earle@MainMethod.AI"
-
-    print(f"\nQuarantining message:")
-    print(f"  Message ID: {message_id[:60]}...")
-    print(f"  Recipient:  {recipient}")
-    print(f"  Subject:    Fwd: VIP Offer: €2000 Bonus Just for You")
+    # --- Target messages ---
+    print(f"\nQuarantining {len(TARGETS)} message(s):")
+    for message_id, recipient in TARGETS:
+        print(f"  {message_id[:60]}...  →  {recipient}")
 
     # --- Call Defender remediate API ---
-    remediate_url = "https://graph.microsoft.com/beta/security/collaboration/analyzedEmails/remediate"
-
-    body = {
-        "displayName": "ICES Quarantine Test",
-        "description": "BlackChamber ICES - live quarantine test",
-        "severity": "high",
-        "action": "softDelete",
-        "remediateBy": "automation",
-        "analyzedEmails": [
-            {
-                "networkMessageId": message_id,
-                "recipientEmailAddress": recipient,
-            }
-        ],
-    }
-
-    print(f"\nPOST {remediate_url}")
-    print(f"Body: {json.dumps(body, indent=2)}")
-    print("\nSending...")
-
+    # One keep-alive client for every remediate call in this run
     try:
-        resp = httpx.post(
-            remediate_url,
-            json=body,
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            timeout=30,
-        )
-        print(f"\nHTTP {resp.status_code}")
-        print(f"Response: {resp.text[:2000]}")
-
-        if resp.status_code < 300:
-            print("\n✅ Quarantine request accepted!")
-        else:
-            print(f"\n❌ Request failed: HTTP {resp.status_code}")
-
+        with httpx.Client(
+            timeout=30, limits=httpx.Limits(max_keepalive_connections=8),
+        ) as client:
+            responses = remediate_all(client, token, TARGETS)
     except Exception as e:
         print(f"\n❌ Error: {e}")
         sys.exit(1)
 
+    failed = 0
+    for resp in responses:
+        print(f"\nHTTP {resp.status_code}")
+        print(f"Response: {resp.text[:2000]}")
+        if resp.status_code >= 300:
+            failed += 1
+
+    if failed:
+        print(f"\n❌ {failed} of {len(responses)} request(s) failed")
+    else:
+        print("\n✅ Quarantine request(s) accepted!")
+
 
 if __name__ == "__main__":
     main()
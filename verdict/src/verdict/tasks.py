@@ -103,7 +103,7 @@ def _get_batch_client() -> BatchClient:
     default_retry_delay=10,
     acks_late=True,
 )
-def execute_verdict(self, verdict_json: str):
+def execute_verdict(self, verdict_data):
     """
     Process a verdict from the analysis engine.
 
@@ -113,10 +113,13 @@ def execute_verdict(self, verdict_json: str):
     4. Persist policy outcome to Postgres
 
     Args:
-        verdict_json: JSON string from the analysis engine.
+        verdict_data: Verdict dict from the analysis engine (msgpack-encoded
+            on the wire). A JSON string is still accepted for messages
+            published before the switch.
     """
     try:
-        verdict_data = json.loads(verdict_json)
+        if isinstance(verdict_data, (str, bytes)):
+            verdict_data = json.loads(verdict_data)
         verdict = VerdictEvent.from_dict(verdict_data)
 
         logger.info(